@@ -1,8 +1,8 @@
-import json
 import logging
 import os
 from datetime import datetime
 
+from src.config import json_loads, setup_logging
 from src.trading_bot import TradingBot
 
 # =============================================================================
@@ -15,23 +15,21 @@ load_dotenv()  # .env 파일에 설정된 값들을 환경 변수로 등록
 # 2. 설정 파일(config.json) 로드
 # =============================================================================
 CONFIG_PATH = os.path.join(os.path.dirname(__file__), "config.json")
-with open(CONFIG_PATH, "r") as f:
-    config = json.load(f)
+with open(CONFIG_PATH, "rb") as f:
+    config = json_loads(f.read())
 
 # =============================================================================
 # 3. 로깅 설정
 # =============================================================================
-log_level = getattr(logging, config.get("log_level", "INFO"))
+# 파일/콘솔 쓰기는 백그라운드 QueueListener 스레드가 담당 (콘솔은 WARNING 이상만 출력)
+log_level = config.get("log_level", "INFO")
 log_file = config.get("log_file", "logs/bot.log")
 
-logging.basicConfig(
-    level=log_level,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-    handlers=[
-        logging.FileHandler(log_file, encoding="utf-8"),
-        logging.StreamHandler()
-    ]
+setup_logging(
+    log_level,
+    log_file,
+    fmt="%(asctime)s [%(levelname)s] %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S"
 )
 logger = logging.getLogger(__name__)
 
@@ -40,7 +38,7 @@ logger = logging.getLogger(__name__)
 # =============================================================================
 def main():
     start_time = datetime.now()
-    logger.info(f"[MAIN] Trading Bot 시작: {start_time}")
+    logger.info("[MAIN] Trading Bot 시작: %s", start_time)
 
     # TradingBot 객체 생성 및 초기화
     bot = TradingBot(config=config)
@@ -52,11 +50,11 @@ def main():
         logger.info("[MAIN] 사용자에 의해 강제 종료됨. 포지션 청산 및 종료 처리 중...")
         bot._final_cleanup()
     except Exception as e:
-        logger.exception(f"[MAIN] 예기치 못한 오류 발생: {e}")
+        logger.exception("[MAIN] 예기치 못한 오류 발생: %s", e)
         bot._final_cleanup()
 
     end_time = datetime.now()
-    logger.info(f"[MAIN] Trading Bot 종료: {end_time}, 총 실행시간: {end_time - start_time}")
+    logger.info("[MAIN] Trading Bot 종료: %s, 총 실행시간: %s", end_time, end_time - start_time)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,35 @@
+import os
+import sys
+
+"""
+AOT-compiles the signal scoring kernel (signals_nb.score_signals) into a
+native extension, src/signal_kernels.*.so, with numba.pycc. signals_nb
+imports it when present, so a fresh process scores its first bar without
+any JIT compile or cache load; without it the @njit version is used.
+
+Rebuild after changing score_signals or upgrading Python / NumPy.
+
+Usage:
+  python scripts/build_kernels.py
+"""
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from numba.pycc import CC
+
+from src.signals_nb import _score_signals_jit
+
+OUTPUT_DIR = os.path.join(os.path.dirname(__file__), "..", "src")
+SCORE_SIGNATURE = "UniTuple(f8, 2)(" + ", ".join(["f8"] * 16) + ")"
+
+
+def main():
+    cc = CC("signal_kernels")
+    cc.output_dir = OUTPUT_DIR
+    cc.export("score_signals", SCORE_SIGNATURE)(_score_signals_jit.py_func)
+    cc.compile()
+    print(f"Wrote {cc.output_file} to {os.path.abspath(OUTPUT_DIR)}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import glob
+import os
+
+import pandas as pd
+
+"""
+Converts 1-minute CSV files to Parquet so backtests load them without text parsing.
+DataHandler picks up data/historical/{symbol}_1min.parquet ahead of the CSV.
+
+Usage:
+  python scripts/csv_to_parquet.py                 # every data/historical/*_1min.csv
+  python scripts/csv_to_parquet.py AAPL MSFT       # only these symbols
+"""
+
+import argparse
+
+HISTORICAL_DIR = "data/historical"
+COLUMNS = ["datetime", "open", "high", "low", "close", "volume"]
+
+
+def convert(csv_path: str) -> str:
+    df = pd.read_csv(csv_path, usecols=COLUMNS, parse_dates=["datetime"])
+    df = df.astype({
+        "open": "float64", "high": "float64", "low": "float64",
+        "close": "float64", "volume": "int64",
+    })
+    parquet_path = os.path.splitext(csv_path)[0] + ".parquet"
+    df.to_parquet(parquet_path, engine="pyarrow", index=False)
+    print(f"Wrote {parquet_path} ({len(df)} rows).")
+    return parquet_path
+
+
+def main(symbols):
+    if symbols:
+        paths = [os.path.join(HISTORICAL_DIR, f"{s}_1min.csv") for s in symbols]
+    else:
+        paths = sorted(glob.glob(os.path.join(HISTORICAL_DIR, "*_1min.csv")))
+    for path in paths:
+        if not os.path.exists(path):
+            print(f"Skipping {path}: not found.")
+            continue
+        convert(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("symbols", nargs="*", help="Ticker symbols, e.g. AAPL MSFT")
+    args = parser.parse_args()
+    main(args.symbols)
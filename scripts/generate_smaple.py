@@ -1,6 +1,5 @@
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
 
 """
 Generates a sample 1-minute CSV for a single symbol over N minutes.
@@ -16,12 +15,16 @@ import argparse
 def main(symbol: str, start_date: str, start_time: str, count: int):
     tz = "America/New_York"
     start_dt = pd.to_datetime(f"{start_date} {start_time}").tz_localize(tz)
-    timestamps = [start_dt + timedelta(minutes=i) for i in range(count)]
-    open_prices = 100 + np.cumsum(np.random.randn(count)) * 0.5
-    high_prices = open_prices + np.abs(np.random.randn(count) * 0.2)
-    low_prices  = open_prices - np.abs(np.random.randn(count) * 0.2)
-    close_prices = open_prices + np.random.randn(count) * 0.1
-    volumes = np.random.randint(100, 1000, count)
+    timestamps = pd.date_range(start_dt, periods=count, freq="1min")
+
+    # One draw for all price noise: columns = walk, high, low, close
+    rng = np.random.default_rng()
+    rnd = rng.standard_normal((count, 4))
+    open_prices = 100 + np.cumsum(rnd[:, 0]) * 0.5
+    high_prices = open_prices + np.abs(rnd[:, 1] * 0.2)
+    low_prices  = open_prices - np.abs(rnd[:, 2] * 0.2)
+    close_prices = open_prices + rnd[:, 3] * 0.1
+    volumes = rng.integers(100, 1000, count)
 
     df = pd.DataFrame({
         "datetime": timestamps,
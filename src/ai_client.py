@@ -1,9 +1,11 @@
 import logging
-import time
+from concurrent.futures import ThreadPoolExecutor
 import requests
-from typing import Dict, Any, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Any, List, Optional, Tuple
 
-from src.config import Config
+from src.config import Config, json_dumps, json_loads
 
 logger = logging.getLogger(__name__)
 
@@ -14,15 +16,54 @@ class AIClient:
     Usage:
       1) Instantiate with config (reads ai_endpoint and api_key).
       2) Call .predict(symbol, features) → returns a float predicted_return.
-      3) Retries HTTP errors up to max_attempts with exponential backoff.
+         Or .predict_many([(symbol, features), ...]) → {symbol: predicted_return},
+         which issues the requests concurrently.
+      3) Retries connection errors and 429/5xx responses up to max_attempts
+         in total, with exponential backoff (honouring Retry-After).
+
+    All requests share one pooled requests.Session, so TCP/TLS connections
+    are reused across calls instead of being re-established per request.
+    predict_many() overlaps the round trips on worker threads (blocking
+    socket reads release the GIL), the same fan-out an asyncio.gather would
+    give without an event loop or an async HTTP dependency.
     """
 
     def __init__(self, config: Config):
         self.config = config
         self.endpoint = config.ai_endpoint
         self.api_key = config.ai_api_key
-        self.max_attempts = int(config.__dict__.get("ai_max_retries", 3))
-        self.timeout = float(config.__dict__.get("ai_request_timeout", 5.0))
+        self.max_attempts = int(getattr(config, "ai_max_retries", 3))
+        self.timeout = float(getattr(config, "ai_request_timeout", 5.0))
+        self.max_workers = int(getattr(config, "ai_max_workers", 32))
+
+        # Request headers never change between calls: build them once
+        self._headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "Accept": "application/json"
+        }
+
+        # Keep-alive session with a connection pool sized for concurrent symbols.
+        # urllib3 performs the retries, so predict() makes a single call.
+        retry = Retry(
+            total=max(0, self.max_attempts - 1),
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["POST"]),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            max_retries=retry,
+            pool_connections=self.max_workers,
+            pool_maxsize=self.max_workers
+        )
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+        # Worker threads for predict_many(), created on first use
+        self._pool: Optional[ThreadPoolExecutor] = None
 
     def predict(self, symbol: str, features: Dict[str, Any]) -> float:
         """
@@ -31,49 +72,60 @@ class AIClient:
 
         Args:
           symbol:   Stock ticker (string)
-          features: Dict where keys are feature names and values are lists of values
+          features: Dict where keys are feature names and values are lists (or 1-D NumPy arrays) of values
         """
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        payload = {
+        # Encode once up front; retries resend the same bytes
+        body = json_dumps({
             "symbol": symbol,
             "features": features
-        }
+        })
+
+        # Retries/backoff happen inside the session's HTTPAdapter
+        try:
+            response = self._session.post(
+                self.endpoint,
+                data=body,
+                headers=self._headers,
+                timeout=self.timeout
+            )
+        except requests.RequestException as e:
+            logger.warning("[AI_CLIENT] All retries failed for %s: %s. Returning 0.0", symbol, e)
+            return 0.0
 
-        attempt = 0
-        backoff = 1.0
-        while attempt < self.max_attempts:
-            try:
-                response = requests.post(
-                    self.endpoint,
-                    json=payload,
-                    headers=headers,
-                    timeout=self.timeout
-                )
-                if response.status_code == 200:
-                    data = response.json()
-                    return float(data.get("predicted_return", 0.0))
-                elif response.status_code in (429, 500, 502, 503, 504):
-                    # Retryable error
-                    logger.warning(
-                        f"[AI_CLIENT] HTTP {response.status_code} for {symbol}. Retrying in {backoff:.1f}s..."
-                    )
-                    time.sleep(backoff)
-                    backoff *= 2
-                    attempt += 1
-                    continue
-                else:
-                    # Non-retryable error
-                    logger.error(f"[AI_CLIENT] Error {response.status_code} for {symbol}: {response.text}")
-                    break
-            except requests.RequestException as e:
-                logger.warning(f"[AI_CLIENT] Request failed for {symbol}: {e}. Retrying in {backoff:.1f}s...")
-                time.sleep(backoff)
-                backoff *= 2
-                attempt += 1
-
-        # Fallback if all attempts fail
-        logger.warning(f"[AI_CLIENT] All retries failed for {symbol}. Returning 0.0")
-        return 0.0
\ No newline at end of file
+        if response.status_code != 200:
+            logger.error("[AI_CLIENT] Error %d for %s: %s", response.status_code, symbol, response.text)
+            return 0.0
+
+        try:
+            data = json_loads(response.content)
+            return float(data.get("predicted_return", 0.0))
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.error("[AI_CLIENT] Invalid response for %s: %s", symbol, e)
+            return 0.0
+
+    def predict_many(self, items: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, float]:
+        """
+        Run predict() for several symbols concurrently over the shared session.
+        Each request keeps its own retry/backoff; failures map to 0.0 as in predict().
+
+        Args:
+          items: List of (symbol, features) pairs
+
+        Returns:
+          Dict mapping symbol → predicted_return
+        """
+        if not items:
+            return {}
+        if len(items) == 1:
+            symbol, features = items[0]
+            return {symbol: self.predict(symbol, features)}
+
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="ai-client"
+            )
+        futures = {
+            symbol: self._pool.submit(self.predict, symbol, features)
+            for symbol, features in items
+        }
+        return {symbol: fut.result() for symbol, fut in futures.items()}
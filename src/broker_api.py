@@ -0,0 +1,239 @@
+# src/broker_api.py
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Literal, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# Kiwoom hoga (order type) codes
+HOGA_LIMIT = "00"   # Limit order
+HOGA_MARKET = "03"  # Market order
+
+# Log formats of the queued requests; the raw fields are kept in the queue
+# and only formatted when a record is actually emitted
+_ORDER_FMT = "%s order %s qty=%d @ %.2f"
+_CANCEL_FMT = "Cancel request for order %s"
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket on the monotonic clock.
+
+    Up to 'capacity' calls pass immediately; after that acquire() blocks just
+    long enough to keep the long-run rate at 'rate' calls per second, and
+    try_acquire() / wait_time() let a caller that must not block schedule
+    the call itself.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        if rate <= 0 or capacity < 1:
+            raise ValueError("rate must be > 0 and capacity >= 1.")
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self) -> None:
+        """Take one token, sleeping only if the bucket is empty."""
+        with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                time.sleep((1.0 - self._tokens) / self.rate)
+
+    def try_acquire(self) -> bool:
+        """Take one token if one is available; never blocks."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+    def wait_time(self) -> float:
+        """Seconds until the next token is available (0.0 if one is now)."""
+        with self._lock:
+            self._refill()
+            return max(0.0, (1.0 - self._tokens) / self.rate)
+
+
+class BrokerAPI:
+    """
+    Wraps Kiwoom SendOrder and related callbacks with rate limiting.
+
+    Kiwoom's OpenAPI control may only be called from the thread that created
+    it (the one running the bot and receiving its events), so BrokerAPI has
+    no thread of its own and every method must be called from that thread.
+    send_order() and cancel_order() queue the request and submit, FIFO, as
+    many queued requests as the token bucket allows right away; the rest go
+    out on later pump() calls (TradingBot pumps on every tick and while
+    waiting for the close). Each returns a Future that is resolved, on the
+    calling thread, once Kiwoom accepted (or rejected) the request, so its
+    done-callbacks run there too.
+    """
+
+    def __init__(
+        self,
+        kiwoom,
+        account_no: str,
+        screen_no: str = "0101",
+        orders_per_sec: Optional[float] = None
+    ):
+        self.kiwoom = kiwoom
+        self.account_no = account_no
+        self.screen_no = screen_no
+        # Load rate limit from config if available, else default 0.2s (5 orders/sec)
+        self.rate_limit_sec = getattr(kiwoom, "rate_limit_sec", 0.2)
+        self.orders_per_sec = float(orders_per_sec or 1.0 / self.rate_limit_sec)
+        # Capacity 1: orders are spaced at least 1/rate apart. A larger
+        # bucket would let a full burst out right after a spaced-out run and
+        # exceed the rate within a one-second window.
+        self._bucket = TokenBucket(rate=self.orders_per_sec, capacity=1.0)
+
+        # FIFO of (future, log format, log fields, SendOrder args) waiting for a token
+        self._pending: deque = deque()
+        self._closed = False
+
+    def _send(self, fut: Future, fmt: str, fields: tuple, args: tuple) -> None:
+        """Call SendOrder for one queued request and resolve its Future."""
+        if not fut.set_running_or_notify_cancel():
+            return
+        try:
+            ret = self.kiwoom.SendOrder(*args)
+        except Exception as e:
+            logger.error("[BROKER] " + fmt + " failed: %s", *fields, e)
+            fut.set_exception(e)
+        else:
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("[BROKER] " + fmt + " sent", *fields)
+            fut.set_result(ret)
+
+    def pump(self) -> Optional[float]:
+        """
+        Submit the queued requests the rate limit allows now.
+
+        Returns:
+            Seconds until the next queued request may be sent, or None when
+            nothing is queued (callers can sleep that long before pumping again).
+        """
+        pending = self._pending
+        while pending:
+            if not self._bucket.try_acquire():
+                return self._bucket.wait_time()
+            self._send(*pending.popleft())
+        return None
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Submit the already-queued requests (still paced, so this blocks),
+        then refuse new ones. Requests left after 'timeout' seconds are
+        cancelled.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        pending = self._pending
+        while pending and (deadline is None or time.monotonic() < deadline):
+            self._bucket.acquire()
+            self._send(*pending.popleft())
+        while pending:
+            fut, fmt, fields, _ = pending.popleft()
+            logger.warning("[BROKER] " + fmt + " not sent before close", *fields)
+            fut.cancel()
+
+    def _submit(self, fmt: str, fields: tuple, args: tuple) -> Future:
+        if self._closed:
+            raise RuntimeError("BrokerAPI is closed.")
+        fut: Future = Future()
+        self._pending.append((fut, fmt, fields, args))
+        self.pump()
+        return fut
+
+    def send_order(
+        self,
+        direction: Literal["BUY", "SELL"],
+        symbol: str,
+        quantity: int,
+        price: float,
+        order_type: str = HOGA_LIMIT
+    ) -> Future:
+        """
+        Queues an order for submission via Kiwoom.
+
+        Args:
+            direction:  "BUY" or "SELL"
+            symbol:     Stock code (string)
+            quantity:   Number of shares (int, > 0)
+            price:      Order price (float, > 0)
+            order_type: HOGA_LIMIT or HOGA_MARKET
+
+        Returns:
+            Future resolving to SendOrder's return value; it carries the
+            exception if Kiwoom rejected the call, so callers can retry.
+
+        Kiwoom’s rate limit (configurable, default 5 orders/sec) is enforced
+        with a token bucket that spaces orders 1/rate apart: an order is sent
+        before this returns if that much time has passed since the previous
+        one, otherwise it waits in the queue for pump(); the calling thread
+        never sleeps.
+        """
+        if quantity <= 0 or price <= 0:
+            raise ValueError("Quantity and price must be positive.")
+
+        sibal = 1 if direction.upper() == "BUY" else 2
+
+        return self._submit(
+            _ORDER_FMT, (direction, symbol, quantity, price),
+            (
+                "OrderRequest",             # User-defined request name
+                self.screen_no,             # Screen number
+                self.account_no,            # Account number
+                sibal,                      # 1=buy, 2=sell
+                symbol,                     # Stock code
+                quantity,                   # Order quantity
+                price,                      # Order price
+                order_type,                 # "00" or "03"
+                ""                          # Original order number (empty for new)
+            )
+        )
+
+    def cancel_order(self, order_id: str) -> Future:
+        """
+        Queues a cancel request for an existing order by its order ID.
+        (Implementation depends on Kiwoom’s cancel syntax.)
+
+        Args:
+          order_id: Kiwoom’s order identifier string.
+
+        Returns:
+          Future resolving once the request was sent (see send_order).
+        """
+        # Example Kiwoom call (actual parameters may differ):
+        return self._submit(
+            _CANCEL_FMT, (order_id,),
+            (
+                "CancelRequest",
+                self.screen_no,
+                self.account_no,
+                3,            # sibal=3 for cancel (example)
+                order_id,     # original order ID
+                0,            # quantity (ignored)
+                0,            # price (ignored)
+                "00",         # hoga type (ignored)
+                order_id      # original order number
+            )
+        )
\ No newline at end of file
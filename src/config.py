@@ -1,9 +1,49 @@
 import os
 import json
+import queue
+import atexit
 import logging
-from jsonschema import validate, ValidationError
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Optional, Tuple
+from jsonschema import Draft7Validator
 import pytz
 
+# fastjsonschema (optional) compiles the schema to plain Python code, which
+# validates an order of magnitude faster than jsonschema's interpreter.
+try:
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
+
+# orjson is optional: it parses/serializes several times faster than the
+# stdlib, which matters for the per-request AI payloads. Fall back to json.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_loads(data):
+    """Parse JSON from str or bytes. Raises json.JSONDecodeError on bad input."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_default(obj):
+    """Stdlib-json fallback for NumPy arrays / scalars (orjson handles them natively)."""
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def json_dumps(obj) -> bytes:
+    """Serialize 'obj' to UTF-8 JSON bytes (NumPy scalars/arrays allowed)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, default=_json_default).encode("utf-8")
+
+
 # =============================================================================
 # 1) JSON SCHEMA DEFINITION
 #    - Mirror every key you expect in config.json here.
@@ -50,6 +90,7 @@ CONFIG_SCHEMA = {
         "historical_bar_period":   {"type": "string"},
         "order_retry_interval_sec":{"type": "number"},
         "loop_interval_sec":       {"type": "number"},
+        "orders_per_sec":          {"type": "number", "exclusiveMinimum": 0},  # optional
         "log_level": {
             "type": "string",
             "enum": ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
@@ -84,20 +125,79 @@ CONFIG_SCHEMA = {
 }
 
 
+# Build the validator once at import. Like jsonschema's validate(), formats
+# (e.g. "uri") are not enforced.
+if fastjsonschema is not None:
+    _VALIDATOR = fastjsonschema.compile(CONFIG_SCHEMA, use_formats=False)
+else:
+    _VALIDATOR = Draft7Validator(CONFIG_SCHEMA)
+
+
+def validate_config(raw: dict) -> None:
+    """
+    Validate a parsed config dict against CONFIG_SCHEMA.
+    Raises ValueError naming the offending field.
+    """
+    if fastjsonschema is not None:
+        try:
+            _VALIDATOR(raw)
+        except fastjsonschema.JsonSchemaValueException as err:
+            raise ValueError(f"config.json validation error: {err.message}")
+        return
+
+    err = next(iter(_VALIDATOR.iter_errors(raw)), None)
+    if err is not None:
+        # err.message tells you exactly which field is wrong/missing
+        raise ValueError(f"config.json validation error: {err.message}")
+
+
 # =============================================================================
 # 2) Logging Helper
 #    - Call this once, after instantiating Config, to configure file + console.
+#    - Callers only enqueue records; a background QueueListener thread does
+#      the file/console I/O, so logging never blocks the trading loop.
 # =============================================================================
-def setup_logging(log_level: str, log_file: str):
-    fmt = "%(asctime)s %(levelname)s %(name)s %(message)s"
-    logging.basicConfig(
-        level=getattr(logging, log_level.upper(), logging.INFO),
-        format=fmt,
-        handlers=[
-            logging.FileHandler(log_file),
-            logging.StreamHandler()
-        ]
+_LOG_LISTENER: Optional[QueueListener] = None
+
+
+def setup_logging(
+    log_level: str,
+    log_file: str,
+    fmt: str = "%(asctime)s %(levelname)s %(name)s %(message)s",
+    datefmt: Optional[str] = None
+) -> QueueListener:
+    """
+    Route the root logger through a QueueHandler. The listener writes to a
+    rotating log file (all levels) and to stderr (WARNING and above), and is
+    stopped – flushing pending records – at interpreter exit.
+    Subsequent calls return the already-running listener.
+    """
+    global _LOG_LISTENER
+    if _LOG_LISTENER is not None:
+        return _LOG_LISTENER
+
+    formatter = logging.Formatter(fmt, datefmt)
+
+    file_handler = RotatingFileHandler(
+        log_file, maxBytes=10 * 1024 * 1024, backupCount=5, encoding="utf-8"
     )
+    file_handler.setFormatter(formatter)
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setLevel(logging.WARNING)
+    stream_handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(getattr(logging, log_level.upper(), logging.INFO))
+    root.addHandler(QueueHandler(log_queue))
+
+    _LOG_LISTENER = QueueListener(
+        log_queue, file_handler, stream_handler, respect_handler_level=True
+    )
+    _LOG_LISTENER.start()
+    atexit.register(_LOG_LISTENER.stop)
+    return _LOG_LISTENER
 
 
 # =============================================================================
@@ -113,30 +213,40 @@ class Config:
     Exposes every setting as a typed attribute.
     """
 
+    # {abs_path: (mtime_ns, Config)} – reused while the file is unchanged
+    _CACHE: Dict[str, Tuple[int, "Config"]] = {}
+
     @staticmethod
     def from_json(path: str) -> "Config":
         """
         Factory: load JSON from 'path', validate against schema,
         and return a Config(...) instance. Raises ValueError on failure.
+
+        Repeated calls for an unmodified file return the cached instance
+        without re-reading or re-validating it.
         """
+        path = os.path.abspath(path)
         if not os.path.isfile(path):
             raise FileNotFoundError(f"Config file not found: {path}")
 
-        with open(path, "r", encoding="utf-8") as f:
+        mtime_ns = os.stat(path).st_mtime_ns
+        cached = Config._CACHE.get(path)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
+
+        with open(path, "rb") as f:
             try:
-                raw = json.load(f)
+                raw = json_loads(f.read())
             except json.JSONDecodeError as e:
                 raise ValueError(f"Invalid JSON in {path}: {e}")
 
         # 1) Validate structure & types
-        try:
-            validate(instance=raw, schema=CONFIG_SCHEMA)
-        except ValidationError as err:
-            # err.message tells you exactly which field is wrong/missing
-            raise ValueError(f"config.json validation error: {err.message}")
+        validate_config(raw)
 
         # 2) Build a Config object
-        return Config(raw)
+        cfg = Config(raw)
+        Config._CACHE[path] = (mtime_ns, cfg)
+        return cfg
 
     def __init__(self, cfg: dict):
         # ──────────────────────────────────────────────
@@ -156,7 +266,8 @@ class Config:
         # ──────────────────────────────────────────────
         # 3) Symbols & Time Zones
         # ──────────────────────────────────────────────
-        self.symbols = cfg["symbols"]  # list[str]
+        # Immutable: iterated on every loop pass and fixed for the run
+        self.symbols = tuple(cfg["symbols"])  # tuple[str, ...]
 
         # Market time zone (e.g. "US/Eastern")
         tz_str = cfg["time_zone"]
@@ -190,6 +301,11 @@ class Config:
         self.bb_period         = int(cfg["bb_period"])
         self.bb_std_dev        = float(cfg["bb_std_dev"])
 
+        # Smoothing constants (fixed for the run; passed straight to the kernels)
+        self.ema_alpha_short   = 2.0 / (self.ema_short_period + 1)
+        self.ema_alpha_long    = 2.0 / (self.ema_long_period + 1)
+        self.rsi_alpha         = 1.0 / self.rsi_period  # Wilder smoothing
+
         # ──────────────────────────────────────────────
         # 6) Historical Data / Backtest Settings
         # ──────────────────────────────────────────────
@@ -201,6 +317,9 @@ class Config:
         # ──────────────────────────────────────────────
         self.order_retry_interval_sec = float(cfg["order_retry_interval_sec"])
         self.loop_interval_sec        = float(cfg["loop_interval_sec"])
+        # Optional broker order rate; None → BrokerAPI's 1 / rate_limit_sec default
+        orders_per_sec = cfg.get("orders_per_sec")
+        self.orders_per_sec = float(orders_per_sec) if orders_per_sec is not None else None
 
         # ──────────────────────────────────────────────
         # 8) Logging Configuration
@@ -237,10 +356,10 @@ if __name__ == "__main__":
         # Immediately enable logging if desired:
         cfg.enable_logging()
         logging.info("Configuration loaded successfully.")
-        logging.info(f"Symbols: {cfg.symbols}")
-        logging.info(f"Market TZ: {cfg.market_tz}")
-        logging.info(f"Local TZ: {cfg.local_tz}")
-        logging.info(f"Initial Capital: {cfg.initial_capital}")
+        logging.info("Symbols: %s", cfg.symbols)
+        logging.info("Market TZ: %s", cfg.market_tz)
+        logging.info("Local TZ: %s", cfg.local_tz)
+        logging.info("Initial Capital: %s", cfg.initial_capital)
     except (FileNotFoundError, ValueError) as e:
         print(f"ERROR: {e}")
         sys.exit(2)
\ No newline at end of file
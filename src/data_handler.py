@@ -3,19 +3,17 @@ import sys
 import time
 import logging
 from datetime import datetime, timedelta
+from collections.abc import Mapping
+from functools import lru_cache
+from operator import itemgetter
+from typing import NamedTuple, Optional, Tuple
 
 import pandas as pd
 import numpy as np
 import pytz
 
 from src.config import Config
-from src.indicators import (
-    compute_ema,
-    compute_rsi,
-    compute_bb,
-    compute_vwap,
-    compute_atr,
-)
+from src.indicators_nb import OUTPUT_COLUMNS, IndicatorState, compute_all
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +30,337 @@ if sys.platform.startswith("win"):
 else:
     Kiwoom = None
 
+# -----------------------------------------------------------------------------
+# pyarrow is optional: memory-mapped Parquet and a multithreaded CSV parser.
+# Without it, backtests read CSV through pandas.
+# -----------------------------------------------------------------------------
+try:
+    import pyarrow.csv as pa_csv
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa_csv = None
+    pc = None
+    ds = None
+    pq = None
+
+# Optional multi-symbol store: one Parquet dataset with a 'symbol' column
+# (or symbol=... hive partitions), opened once per historical load.
+HISTORICAL_DATASET_DIR = "data/historical/1min"
+
+
+NS_PER_MINUTE = 60_000_000_000
+NS_PER_DAY = 1_440 * NS_PER_MINUTE
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=pytz.utc)
+_EPOCH_NAIVE = datetime(1970, 1, 1)
+
+
+def _epoch_ns(dt: datetime) -> int:
+    """UTC epoch nanoseconds of a datetime / pd.Timestamp (naive means UTC)."""
+    if isinstance(dt, pd.Timestamp):
+        return dt.value
+    delta = dt - (_EPOCH_NAIVE if dt.tzinfo is None else _EPOCH_UTC)
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000_000 + delta.microseconds * 1_000
+
+
+# Columns read from raw bar files / the Parquet dataset
+RAW_COLUMNS = ("datetime", "open", "high", "low", "close", "volume")
+
+# Column layout of every per-symbol bar store / DataFrame
+BAR_COLUMNS = [
+    "open", "high", "low", "close", "volume",
+    "ema_short", "ema_long", "rsi",
+    "bb_hband", "bb_lband", "bb_mavg",
+    "vwap", "atr"
+]
+_COL = {name: j for j, name in enumerate(BAR_COLUMNS)}
+
+
+class IndicatorsView(NamedTuple):
+    """
+    Last K bars of one symbol as read-only NumPy views (oldest first).
+    Returned by DataHandler.latest(); `ts` holds UTC epoch-ns timestamps.
+    """
+    ts:        np.ndarray
+    close:     np.ndarray
+    ema_short: np.ndarray
+    ema_long:  np.ndarray
+    rsi:       np.ndarray
+    bb_hband:  np.ndarray
+    bb_lband:  np.ndarray
+    bb_mavg:   np.ndarray
+    vwap:      np.ndarray
+    atr:       np.ndarray
+
+
+@lru_cache(maxsize=None)
+def _row_getter(columns: tuple):
+    """Callable picking 'columns' (always as a tuple) out of a BAR_COLUMNS-ordered row list."""
+    idx = [_COL[name] for name in columns]
+    if len(idx) == 1:
+        j = idx[0]
+        return lambda row: (row[j],)
+    return itemgetter(*idx)
+
+
+@lru_cache(maxsize=64)
+def _read_bar_file(path: str, mtime_ns: int) -> pd.DataFrame:
+    """
+    Read a raw bar file (Parquet or CSV) indexed by 'datetime'.
+
+    Cached per (path, mtime_ns): reloading an unchanged file costs nothing.
+    The returned frame is shared, so callers must not modify it in place.
+    """
+    if path.endswith(".parquet"):
+        df = pq.read_table(
+            path, columns=list(RAW_COLUMNS), memory_map=True
+        ).to_pandas(self_destruct=True)
+    elif pa_csv is not None:
+        df = pa_csv.read_csv(
+            path, convert_options=pa_csv.ConvertOptions(include_columns=list(RAW_COLUMNS))
+        ).to_pandas(self_destruct=True)
+    else:
+        df = pd.read_csv(path, usecols=list(RAW_COLUMNS), parse_dates=["datetime"])
+    return df.set_index("datetime")
+
+
+class BarBuffer:
+    """
+    Append-only column store for one symbol's 1-minute bars.
+
+    Values live in a preallocated float64 block (one row per column, so each
+    column is contiguous) next to an int64 array of UTC epoch-ns timestamps.
+    append() is a single indexed store and prune_before() only advances the
+    start pointer. When the block is full, the live rows are copied into a
+    fresh block (doubling if needed), so DataFrames handed out earlier keep
+    viewing memory that is never written again. Once pruning leaves the
+    block mostly empty (e.g. after loading a long history), the live rows
+    are compacted into a small block, so steady-state memory stays at about
+    2 × the retention window per symbol.
+
+    Storage stays float64: the live window is only a few hundred rows per
+    symbol, and ATR's Wilder recursion reads the stored previous ATR/close
+    back, so float32 rounding would accumulate and drift from `ta`.
+    """
+
+    MIN_CAPACITY = 256
+
+    def __init__(self, capacity: int = MIN_CAPACITY):
+        self._data = np.empty((len(BAR_COLUMNS), capacity))
+        self._ts = np.empty(capacity, dtype=np.int64)
+        self._start = 0
+        self._end = 0
+        self.version = 0  # bumped on every mutation (frame cache key)
+        # Newest bar as plain scalars, for the per-bar integrity checks
+        self.last_ts_ns: Optional[int] = None
+        self.last_close = np.nan
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def load(self, df: pd.DataFrame):
+        """Replace the contents with 'df' (tz-aware index, any subset of BAR_COLUMNS)."""
+        n = len(df)
+        capacity = max(self.MIN_CAPACITY, 2 * n)
+        self._data = np.full((len(BAR_COLUMNS), capacity), np.nan)
+        self._ts = np.empty(capacity, dtype=np.int64)
+        for j, col in enumerate(BAR_COLUMNS):
+            if col in df.columns:
+                self._data[j, :n] = df[col].to_numpy(dtype=np.float64)
+        if n:
+            self._ts[:n] = df.index.as_unit("ns").asi8
+            self.last_ts_ns = int(self._ts[n - 1])
+            self.last_close = float(self._data[_COL["close"], n - 1])
+        else:
+            self.last_ts_ns = None
+            self.last_close = np.nan
+        self._start = 0
+        self._end = n
+        self.version += 1
+
+    def append(self, ts_ns: int, row):
+        """Append one bar; 'row' holds a value for every entry of BAR_COLUMNS."""
+        if self._end == self._ts.shape[0]:
+            self._reallocate()
+        self._data[:, self._end] = row
+        self._ts[self._end] = ts_ns
+        self._end += 1
+        self.last_ts_ns = ts_ns
+        self.last_close = row[_COL["close"]]
+        self.version += 1
+
+    def prune_before(self, cutoff_ns: int):
+        """Drop every bar stamped earlier than cutoff_ns (timestamps are sorted)."""
+        live = self._ts[self._start:self._end]
+        self._start += int(np.searchsorted(live, cutoff_ns, side="left"))
+        capacity = self._ts.shape[0]
+        if capacity > self.MIN_CAPACITY and 4 * len(self) < capacity:
+            self._reallocate()
+        self.version += 1
+
+    def column(self, name: str) -> np.ndarray:
+        """Zero-copy view of one column over the live rows."""
+        return self._data[_COL[name], self._start:self._end]
+
+    def block(self, window: slice) -> np.ndarray:
+        """Zero-copy (len(BAR_COLUMNS), m) view of every column over 'window' of the live rows."""
+        return self._data[:, self._start:self._end][:, window]
+
+    def timestamps(self) -> np.ndarray:
+        """Zero-copy view of the live rows' UTC epoch-ns timestamps."""
+        return self._ts[self._start:self._end]
+
+    def frame(self, tz) -> pd.DataFrame:
+        """DataFrame view of the live rows, indexed by tz-aware datetime in 'tz'."""
+        index = pd.DatetimeIndex(
+            self._ts[self._start:self._end].view("datetime64[ns]")
+        ).tz_localize("UTC").tz_convert(tz)
+        return pd.DataFrame(
+            self._data[:, self._start:self._end].T,
+            index=index,
+            columns=BAR_COLUMNS,
+            copy=False
+        )
+
+    def _reallocate(self):
+        n = len(self)
+        capacity = max(self.MIN_CAPACITY, 2 * (n + 1))
+        data = np.empty((len(BAR_COLUMNS), capacity))
+        ts = np.empty(capacity, dtype=np.int64)
+        data[:, :n] = self._data[:, self._start:self._end]
+        ts[:n] = self._ts[self._start:self._end]
+        self._data, self._ts = data, ts
+        self._start, self._end = 0, n
+
+
+class TickBuffer:
+    """
+    Preallocated price/volume arrays for one symbol's not-yet-finalized ticks.
+
+    Ticks arrive in time order, so each pending minute occupies one contiguous
+    run of the arrays; '_starts' maps minute → index of its first tick.
+    append() is two indexed stores. take() hands back views of a minute's run
+    and rewinds the arrays once nothing is pending, so capacity stays at
+    roughly one minute's worth of ticks.
+    """
+
+    MIN_CAPACITY = 1024
+
+    def __init__(self, capacity: int = MIN_CAPACITY):
+        self._price = np.empty(capacity, dtype=np.float64)
+        self._volume = np.empty(capacity, dtype=np.int64)
+        self._n = 0
+        self._starts = {}  # minute → start index, in arrival order
+
+    def __len__(self) -> int:
+        return self._n
+
+    def append(self, minute, price: float, volume: int):
+        n = self._n
+        if n == self._price.shape[0]:
+            self._price = np.concatenate((self._price, np.empty(n)))
+            self._volume = np.concatenate((self._volume, np.empty(n, dtype=np.int64)))
+        if minute not in self._starts:
+            self._starts[minute] = n
+        self._price[n] = price
+        self._volume[n] = volume
+        self._n = n + 1
+
+    def take(self, minute) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Remove 'minute' and return (prices, volumes) views of its ticks, or
+        None if nothing is buffered for it. The views are only valid until
+        the next append().
+        """
+        start = self._starts.pop(minute, None)
+        if start is None:
+            return None
+        end = min((s for s in self._starts.values() if s > start), default=self._n)
+        prices = self._price[start:end]
+        volumes = self._volume[start:end]
+        if not self._starts:
+            self._n = 0
+        return prices, volumes
+
+
+class TickRing:
+    """
+    Fixed-size single-producer / single-consumer tick queue for one symbol,
+    stored as parallel NumPy arrays (epoch-ns timestamp, price, volume).
+
+    The producer writes a slot, then advances 'head'; the consumer reads the
+    slots up to 'head', then advances 'tail'. Each counter has exactly one
+    writer and the GIL orders the slot stores before the counter update, so
+    neither side takes a lock. A full ring rejects the tick (push() → False).
+    """
+
+    CAPACITY = 4096
+
+    def __init__(self, capacity: int = CAPACITY):
+        self._ts = np.empty(capacity, dtype=np.int64)
+        self._price = np.empty(capacity, dtype=np.float64)
+        self._volume = np.empty(capacity, dtype=np.int64)
+        self._capacity = capacity
+        self.head = 0  # written by the producer only
+        self.tail = 0  # written by the consumer only
+
+    def __len__(self) -> int:
+        return self.head - self.tail
+
+    def push(self, ts_ns: int, price: float, volume: int) -> bool:
+        """Producer side: store one tick; False (tick not stored) if the ring is full."""
+        head = self.head
+        if head - self.tail >= self._capacity:
+            return False
+        j = head % self._capacity
+        self._ts[j] = ts_ns
+        self._price[j] = price
+        self._volume[j] = volume
+        self.head = head + 1
+        return True
+
+    def pop_all(self) -> Tuple[list, list, list]:
+        """Consumer side: remove every stored tick, returned as (ts_ns, prices, volumes) lists."""
+        head, tail = self.head, self.tail
+        if head == tail:
+            return [], [], []
+        idx = np.arange(tail, head) % self._capacity
+        out = self._ts[idx].tolist(), self._price[idx].tolist(), self._volume[idx].tolist()
+        self.tail = head
+        return out
+
+
+class _HistoricalFrames(Mapping):
+    """
+    Dict-like {symbol → DataFrame} over the per-symbol BarBuffers.
+
+    Frames are materialized on first access and cached until the buffer
+    changes; assigning a DataFrame replaces that symbol's buffer contents.
+    """
+
+    def __init__(self, buffers: dict, tz):
+        self._buffers = buffers
+        self._tz = tz
+        self._cache = {}
+
+    def __getitem__(self, symbol: str) -> pd.DataFrame:
+        buf = self._buffers[symbol]
+        cached = self._cache.get(symbol)
+        if cached is None or cached[0] != buf.version:
+            cached = (buf.version, buf.frame(self._tz))
+            self._cache[symbol] = cached
+        return cached[1]
+
+    def __setitem__(self, symbol: str, df: pd.DataFrame):
+        self._buffers[symbol].load(df)
+
+    def __iter__(self):
+        return iter(self._buffers)
+
+    def __len__(self) -> int:
+        return len(self._buffers)
+
 
 class DataHandler:
     """
@@ -39,46 +368,85 @@ class DataHandler:
 
     Attributes:
         config:            Config
-        mode:              "live" or "backtest"
+        mode:              "live", "live_sim" or "backtest"
         time_zone:         pytz timezone (e.g., America/New_York)
         local_tz:          pytz timezone (e.g., Asia/Seoul)
-        historical_data:   Dict[str, pd.DataFrame]
-                           – Each DataFrame has columns:
+        historical_data:   Mapping[str, pd.DataFrame]
+                           – Each DataFrame has columns BAR_COLUMNS:
                              ['open','high','low','close','volume',
                               'ema_short','ema_long','rsi',
                               'bb_hband','bb_lband','bb_mavg',
                               'vwap','atr']
                            – Indexed by tz-aware datetime (market tz)
-        real_time_buffer:  Dict[str, Dict[datetime, List[Dict[str,Any]]]]
-                           – For each symbol: minute_ts → list of tick dicts
+                           – Lazily built view over _bars[symbol]
+        _bars:             Dict[str, BarBuffer] – backing bar storage per symbol
+        real_time_buffer:  Dict[str, TickBuffer] – pending ticks per symbol (SoA arrays)
         last_timestamp:    Dict[str, Optional[datetime]] – last finalized minute per symbol
+        _last_minute:      Dict[str, Optional[int]] – the same minute as UTC epoch minutes
+                           (what the tick path compares; see _set_last_minute)
+        _ind_state:        Dict[str, IndicatorState] – running EMA/RSI/BB/VWAP/ATR state per symbol
+        _replay_end:       Dict[str, Optional[int]] – backtest replay cursor: when set, the
+                           bar queries only see the first N stored bars (see set_replay_end)
         kiwoom:            Kiwoom instance if live+Windows; else None
+        _session:          Shared handles for the current historical load
+                           {'cutoff': datetime, 'dataset': pyarrow Dataset or None}
     """
 
     def __init__(self, config: Config, mode: str = "live"):
         self.config = config
-        self.mode = mode  # "live" or "backtest"
+        self.mode = mode  # "live", "live_sim" or "backtest"
         self.time_zone = config.time_zone    # e.g., America/New_York
         self.local_tz = config.local_tz      # e.g., Asia/Seoul
 
-        # Initialize empty DataFrames for each symbol
-        self.historical_data = {
-            symbol: pd.DataFrame(columns=[
-                "open", "high", "low", "close", "volume",
-                "ema_short", "ema_long", "rsi",
-                "bb_hband", "bb_lband", "bb_mavg",
-                "vwap", "atr"
-            ])
-            for symbol in self.config.symbols
-        }
+        # Preallocated bar storage per symbol, exposed as DataFrames on demand
+        self._bars = {symbol: BarBuffer() for symbol in self.config.symbols}
+        self.historical_data = _HistoricalFrames(self._bars, self.time_zone)
+
+        # Per-symbol real-time tick buffer (preallocated price/volume arrays)
+        self.real_time_buffer = {symbol: TickBuffer() for symbol in self.config.symbols}
 
-        # Per-symbol real-time tick buffer: {symbol → {minute_ts → [tick_dicts]}}
-        self.real_time_buffer = {symbol: {} for symbol in self.config.symbols}
+        # Per-symbol tick inbox for a producer thread (see submit_tick): a
+        # lock-free single-producer / single-consumer ring of NumPy arrays
+        self._tick_inbox = {symbol: TickRing() for symbol in self.config.symbols}
 
         # Track last committed minute timestamp (tz-aware) per symbol
         self.last_timestamp = {symbol: None for symbol in self.config.symbols}
+        self._last_minute = {symbol: None for symbol in self.config.symbols}
+
+        # Backtest replay cursor per symbol (None → every stored bar is visible)
+        self._replay_end = {symbol: None for symbol in self.config.symbols}
+
+        # compute_indicators() memo: symbol → ((buffer version, replay end), frame copy)
+        self._frame_memo = {}
 
-        # If in live mode on Windows, connect to Kiwoom
+        # Live retention window (3 × the longest indicator lookback), fixed for the run
+        self._lookback_ns = 3 * max(
+            self.config.ema_long_period,
+            self.config.rsi_period,
+            self.config.bb_period
+        ) * NS_PER_MINUTE
+
+        # Running indicator state per symbol, seeded on historical load and
+        # advanced one bar at a time by _finalize_minute_bar()
+        self._ind_state = {
+            symbol: IndicatorState(
+                ema_s=self.config.ema_short_period,
+                ema_l=self.config.ema_long_period,
+                rsi_n=self.config.rsi_period,
+                bb_n=self.config.bb_period,
+                bb_k=self.config.bb_std_dev,
+                atr_n=self.config.atr_period,
+                alpha_s=self.config.ema_alpha_short,
+                alpha_l=self.config.ema_alpha_long,
+                alpha_rsi=self.config.rsi_alpha,
+            )
+            for symbol in self.config.symbols
+        }
+
+        # Set up by update_historical_all() and shared by every symbol's load
+        self._session: Optional[dict] = None
+
+        # If in live mode on Windows, connect to Kiwoom (once, for all symbols)
         if self.mode == "live" and Kiwoom is not None:
             if not sys.platform.startswith("win"):
                 raise EnvironmentError("KiwoomOpenAPI+ only works on Windows.")
@@ -100,10 +468,10 @@ class DataHandler:
         """
         Retrieve historical 1-minute bars for 'symbol'.
 
-        - If mode == "backtest": load from CSV via _load_from_csv().
+        - If mode == "backtest" or "live_sim": load from CSV via _load_from_csv().
         - If mode == "live": fetch from Kiwoom via _fetch_historical_kiwoom().
         """
-        if self.mode == "backtest":
+        if self.mode in ("backtest", "live_sim"):
             return self._load_from_csv(symbol)
 
         # Live mode
@@ -119,59 +487,104 @@ class DataHandler:
           - self.last_timestamp[symbol] = most recent minute_ts for that symbol
           - Logs row count or warns if empty.
         """
+        self._session = self._open_session()
         for symbol in self.config.symbols:
             try:
                 df = self.fetch_historical(symbol)
             except Exception as e:
-                logger.error(f"[DATA] Failed to load historical for {symbol}: {e}")
-                df = pd.DataFrame(columns=[
-                    "open", "high", "low", "close", "volume",
-                    "ema_short", "ema_long", "rsi",
-                    "bb_hband", "bb_lband", "bb_mavg",
-                    "vwap", "atr"
-                ])
+                logger.error("[DATA] Failed to load historical for %s: %s", symbol, e)
+                df = pd.DataFrame(columns=BAR_COLUMNS)
 
             if not df.empty:
                 df = df.sort_index()
                 self.historical_data[symbol] = df
-                self.last_timestamp[symbol] = df.index.max()
-                logger.info(f"[DATA] {symbol} historical loaded: {len(df)} rows.")
+                self._set_last_minute(symbol, df.index.max().value // NS_PER_MINUTE)
+                logger.info("[DATA] %s historical loaded: %d rows.", symbol, len(df))
             else:
                 self.historical_data[symbol] = df
-                self.last_timestamp[symbol] = None
-                logger.warning(f"[DATA] {symbol} has no historical bars.")
+                self._set_last_minute(symbol, None)
+                self._ind_state[symbol].reset()
+                logger.warning("[DATA] %s has no historical bars.", symbol)
+
+    # -------------------------------------------------------------------------
+    # Private: Shared state for one historical load
+    # -------------------------------------------------------------------------
+    def _open_session(self) -> dict:
+        """
+        Resolve everything the per-symbol loaders share exactly once per
+        load: the lookback cutoff (from the current time, so each reload
+        moves it forward) and, in backtest mode, the multi-symbol Parquet
+        dataset (if present). Kiwoom itself is connected once in __init__.
+        """
+        dataset = None
+        if self.mode == "backtest" and ds is not None and os.path.isdir(HISTORICAL_DATASET_DIR):
+            dataset = ds.dataset(HISTORICAL_DATASET_DIR, format="parquet", partitioning="hive")
+        return {"cutoff": self._lookback_start(), "dataset": dataset}
+
+    def _lookback_start(self) -> datetime:
+        """now − historical_lookback_days, in the market time zone."""
+        return datetime.utcnow().replace(tzinfo=pytz.utc).astimezone(self.time_zone) - timedelta(
+            days=self.config.historical_lookback_days
+        )
+
+    def _history_cutoff(self) -> datetime:
+        """Oldest timestamp kept on load: the current load's cutoff, else computed now."""
+        if self._session is not None:
+            return self._session["cutoff"]
+        return self._lookback_start()
+
+    def _cut_history(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Sort by time (if needed) and drop rows older than the history cutoff
+        with a binary search on the index rather than a boolean mask.
+        """
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index()
+        return df.iloc[df.index.searchsorted(self._history_cutoff(), side="left"):]
 
     # -------------------------------------------------------------------------
     # Private: Load from CSV (backtest)
     # -------------------------------------------------------------------------
     def _load_from_csv(self, symbol: str) -> pd.DataFrame:
         """
-        Load historical 1-min bars from CSV: data/historical/{symbol}_1min.csv.
+        Load historical 1-min bars, preferring (in order):
+          - the shared Parquet dataset (HISTORICAL_DATASET_DIR), filtered to 'symbol'
+          - data/historical/{symbol}_1min.parquet (memory-mapped, requires pyarrow)
+          - data/historical/{symbol}_1min.csv
 
         Expects columns: ['datetime','open','high','low','close','volume'].
         Returns a DataFrame indexed by tz-aware datetime in time_zone, pruned to last historical_lookback_days.
         """
-        path = f"data/historical/{symbol}_1min.csv"
-        if not os.path.exists(path):
-            raise FileNotFoundError(f"No CSV for {symbol} at {path}")
+        dataset = self._session["dataset"] if self._session is not None else None
+        if dataset is not None and "symbol" in dataset.schema.names:
+            tbl = dataset.to_table(
+                columns=list(RAW_COLUMNS),
+                filter=pc.field("symbol") == symbol
+            )
+            df = tbl.to_pandas(self_destruct=True).set_index("datetime")
+        else:
+            df = None
+
+        if df is None or df.empty:
+            path = f"data/historical/{symbol}_1min.parquet"
+            if pq is None or not os.path.exists(path):
+                path = f"data/historical/{symbol}_1min.csv"
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"No CSV for {symbol} at {path}")
 
-        df = pd.read_csv(path, parse_dates=["datetime"])
-        df.set_index("datetime", inplace=True)
+            df = _read_bar_file(path, os.stat(path).st_mtime_ns)
 
-        # Localize or convert to market tz
+        # Localize or convert to market tz (new frame; the cached one is untouched)
         if df.index.tzinfo is None:
-            df.index = df.index.tz_localize(self.time_zone)
+            df = df.tz_localize(self.time_zone)
         else:
-            df.index = df.index.tz_convert(self.time_zone)
+            df = df.tz_convert(self.time_zone)
 
         # Prune to last N days
-        cutoff = datetime.utcnow().replace(tzinfo=pytz.utc).astimezone(self.time_zone) - timedelta(
-            days=self.config.historical_lookback_days
-        )
-        df = df[df.index >= cutoff]
+        df = self._cut_history(df)
 
         # Compute indicators
-        df = self._compute_all_indicators(df)
+        df = self._compute_all_indicators(df, self._ind_state[symbol])
         return df
 
     # -------------------------------------------------------------------------
@@ -184,7 +597,11 @@ class DataHandler:
         Returns a DataFrame indexed by tz-aware datetime with columns:
         ['open','high','low','close','volume','ema_short','ema_long','rsi','bb_hband','bb_lband','bb_mavg','vwap','atr'].
         """
-        all_pages = []
+        # Kiwoom column → our column; pages are collected per column as arrays
+        # and joined once at the end
+        fields = {"체결시간": "datetime", "시가": "open", "고가": "high",
+                  "저가": "low", "현재가": "close", "거래량": "volume"}
+        pages = {col: [] for col in fields.values()}
         next_flag = "0"
         rqname = f"{symbol}_분봉요청"
         trcode = "opt10080"
@@ -203,7 +620,16 @@ class DataHandler:
                 screen_no=screen_no,
                 output="주식분봉차트조회"
             )
-            all_pages.append(df_page)
+            # Kiwoom returns strings, possibly padded and signed ("-12345");
+            # convert per page so the joined columns are float64/int64
+            for src_col, col in fields.items():
+                raw = df_page[src_col]
+                if col == "datetime":
+                    pages[col].append(raw.to_numpy())
+                else:
+                    num = pd.to_numeric(raw.astype(str).str.strip())
+                    pages[col].append(num.to_numpy(
+                        dtype=np.int64 if col == "volume" else np.float64))
 
             try:
                 has_more = self.kiwoom.remained_data
@@ -216,90 +642,115 @@ class DataHandler:
             next_flag = "2"
             time.sleep(0.2)  # respect ≤ 5 TR calls/sec
 
-        if not all_pages:
-            return pd.DataFrame(columns=[
-                "open", "high", "low", "close", "volume",
-                "ema_short", "ema_long", "rsi",
-                "bb_hband", "bb_lband", "bb_mavg",
-                "vwap", "atr"
-            ])
+        cols = {col: np.concatenate(arrs) for col, arrs in pages.items()}
+        if not len(cols["datetime"]):
+            return pd.DataFrame(columns=BAR_COLUMNS)
 
-        df_raw = pd.concat(all_pages, ignore_index=True)
+        # Parse the whole timestamp column in one vectorized call
+        # (Kiwoom sends either "YYYYmmdd HHMMSS" or "YYYYmmddHHMMSS")
+        ts_raw = pd.Series(cols["datetime"]).astype(str).str.replace(" ", "", regex=False)
+        ts = pd.to_datetime(ts_raw, format="%Y%m%d%H%M%S", cache=True)
+        index = pd.DatetimeIndex(ts.dt.tz_localize(
+            self.time_zone, ambiguous="NaT", nonexistent="shift_forward"
+        ), name="datetime")
 
-        # Rename & parse columns
+        # Build the frame (price fields carry the tick direction as their sign)
         df_renamed = pd.DataFrame({
-            "datetime": df_raw["체결시간"],
-            "open":     df_raw["시가"],
-            "high":     df_raw["고가"],
-            "low":      df_raw["저가"],
-            "close":    df_raw["현재가"].abs(),
-            "volume":   df_raw["거래량"]
-        })
-
-        def parse_minute_ts(x):
-            if isinstance(x, str):
-                try:
-                    dt_naive = datetime.strptime(x, "%Y%m%d %H%M%S")
-                except ValueError:
-                    dt_naive = datetime.strptime(str(x), "%Y%m%d%H%M%S")
-            else:
-                dt_naive = pd.to_datetime(x, format="%Y%m%d%H%M%S").to_pydatetime()
-            return self.time_zone.localize(dt_naive)
+            "open":     np.abs(cols["open"]),
+            "high":     np.abs(cols["high"]),
+            "low":      np.abs(cols["low"]),
+            "close":    np.abs(cols["close"]),
+            "volume":   np.abs(cols["volume"])
+        }, index=index)
+        if index.hasnans:  # ambiguous DST-fold minutes
+            df_renamed = df_renamed[index.notna()]
 
-        df_renamed["datetime"] = df_renamed["datetime"].apply(parse_minute_ts)
-        df_renamed.set_index("datetime", inplace=True)
-        df_sorted = df_renamed.sort_index()
-
-        cutoff = datetime.utcnow().replace(tzinfo=pytz.utc).astimezone(self.time_zone) - timedelta(
-            days=self.config.historical_lookback_days
-        )
-        df_sorted = df_sorted[df_sorted.index >= cutoff]
+        df_sorted = self._cut_history(df_renamed)
 
         # Compute indicators
-        df_sorted = self._compute_all_indicators(df_sorted)
+        df_sorted = self._compute_all_indicators(df_sorted, self._ind_state[symbol])
         return df_sorted
 
     # -------------------------------------------------------------------------
     # Real-time tick ingestion → time-based 1-min aggregation
     # -------------------------------------------------------------------------
+    def submit_tick(self, symbol: str, new_tick: dict):
+        """
+        Hand a tick over from a producer thread (e.g. a feed) without touching
+        any bar state. The consuming thread applies it via drain_ticks().
+        One producer per symbol; if the consumer falls a full ring behind,
+        the tick is dropped with a warning.
+        """
+        ts_ns = _epoch_ns(new_tick["datetime"])
+        if not self._tick_inbox[symbol].push(ts_ns, new_tick["price"], new_tick["volume"]):
+            logger.warning("[DATA] %s: tick inbox full → tick dropped", symbol)
+
+    def drain_ticks(self, symbol: str) -> int:
+        """
+        Apply every tick queued by submit_tick() for 'symbol' (same steps as
+        update_realtime()), on the calling (consumer) thread.
+        Returns the number of ticks processed.
+        """
+        ts, prices, volumes = self._tick_inbox[symbol].pop_all()
+        for ts_ns, price, volume in zip(ts, prices, volumes):
+            self._ingest_tick(symbol, ts_ns // NS_PER_MINUTE, price, volume)
+        return len(ts)
+
     def update_realtime(self, symbol: str, new_tick: dict):
         """
         Called for each real-time tick:
           new_tick: {'datetime': datetime (UTC-naive or tz-aware), 'price': float, 'volume': int}
 
         Steps:
-          1) Convert new_tick['datetime'] → tz-aware UTC → to market tz.
-          2) Floor to the minute: minute_ts = dt_ny.replace(sec=0,μs=0).
-          3) Buffer under real_time_buffer[symbol][minute_ts].
-          4) If minute_ts > last_timestamp[symbol], finalize all prior minutes via _finalize_minute_bar().
+          1) Convert new_tick['datetime'] → UTC epoch ns.
+          2) Floor to the minute: minute_id = ts_ns // NS_PER_MINUTE (market-tz
+             offsets are whole minutes, so this equals flooring in market time).
+          3) If minute_id > the open minute, finalize the open minute via _finalize_minute_bar().
+             Ticks arrive in time order and late ones are dropped, so the open
+             minute is the only one ever buffered: no scan over pending minutes.
+          4) Append price/volume to real_time_buffer[symbol] under minute_id.
+        Ticks for a minute older than last_timestamp arrive after their bar was
+        finalized and are dropped.
         """
-        raw_dt = new_tick["datetime"]
-        if raw_dt.tzinfo is None:
-            raw_dt = pytz.utc.localize(raw_dt)
-
-        dt_ny = raw_dt.astimezone(self.time_zone)
-        minute_ts = dt_ny.replace(second=0, microsecond=0)
+        minute_id = _epoch_ns(new_tick["datetime"]) // NS_PER_MINUTE
+        self._ingest_tick(symbol, minute_id, new_tick["price"], new_tick["volume"])
 
+    def _ingest_tick(self, symbol: str, minute_id: int, price: float, volume: int):
+        """Steps 3-4 of update_realtime() for a tick already floored to 'minute_id'."""
         buff = self.real_time_buffer[symbol]
-        if minute_ts not in buff:
-            buff[minute_ts] = []
-        buff[minute_ts].append({
-            "datetime": dt_ny,
-            "price": new_tick["price"],
-            "volume": new_tick["volume"]
-        })
+        last_id = self._last_minute[symbol]
+        if last_id is None:
+            self._set_last_minute(symbol, minute_id)
+        elif minute_id > last_id:
+            if len(buff):
+                self._finalize_minute_bar(symbol, last_id)
+            self._set_last_minute(symbol, minute_id)
+        elif minute_id < last_id:
+            logger.warning(
+                "[DATA] %s: late tick for %s (open minute %s) → dropped",
+                symbol, self._minute_dt(minute_id).isoformat(), self._minute_dt(last_id).isoformat()
+            )
+            return
+
+        buff.append(minute_id, price, volume)
+
+    def _set_last_minute(self, symbol: str, minute_id: Optional[int]):
+        """Record the open minute as epoch minutes and as a tz-aware last_timestamp."""
+        self._last_minute[symbol] = minute_id
+        self.last_timestamp[symbol] = None if minute_id is None else self._minute_dt(minute_id)
 
-        last_ts = self.last_timestamp[symbol]
-        if last_ts is not None and minute_ts > last_ts:
-            to_finalize = [ts for ts in buff if ts <= last_ts]
-            for ts in to_finalize:
-                self._finalize_minute_bar(symbol, ts)
+    def _minute_dt(self, minute_id: int) -> datetime:
+        """tz-aware datetime (market tz) for an epoch-minute id."""
+        return datetime.fromtimestamp(minute_id * 60, tz=pytz.utc).astimezone(self.time_zone)
 
-            self.last_timestamp[symbol] = minute_ts
+    def _session_id(self, minute_id: int) -> int:
+        """Trading-day id of a minute: days since epoch of its market-tz date."""
+        offset = self._minute_dt(minute_id).utcoffset()
+        return (minute_id * 60 + offset.days * 86_400 + offset.seconds) // 86_400
 
-    def _finalize_minute_bar(self, symbol: str, minute_ts: datetime):
+    def _finalize_minute_bar(self, symbol: str, minute_id: int):
         """
-        Aggregate buffered ticks for 'minute_ts' into a 1-min bar:
+        Aggregate buffered ticks for 'minute_id' (UTC epoch minutes) into a 1-min bar:
           - open = first tick price
           - high = max price
           - low  = min price
@@ -307,122 +758,235 @@ class DataHandler:
           - volume = sum volumes
         Then append to historical_data and run data checks & pruning.
         """
-        buffer_for_minute = self.real_time_buffer[symbol].pop(minute_ts, [])
-        if not buffer_for_minute:
+        ticks = self.real_time_buffer[symbol].take(minute_id)
+        if ticks is None or not len(ticks[0]):
             logger.warning(
-                f"[DATA] {symbol}: no ticks for minute {minute_ts.isoformat()} → skipping"
+                "[DATA] %s: no ticks for minute %s → skipping", symbol, self._minute_dt(minute_id).isoformat()
             )
             return
 
-        df_ticks = pd.DataFrame(buffer_for_minute).set_index("datetime")
-        open_p  = df_ticks["price"].iloc[0]
-        high_p  = df_ticks["price"].max()
-        low_p   = df_ticks["price"].min()
-        close_p = df_ticks["price"].iloc[-1]
-        volume  = df_ticks["volume"].sum()
-
-        new_bar = pd.DataFrame({
-            "open":  [open_p],
-            "high":  [high_p],
-            "low":   [low_p],
-            "close": [close_p],
-            "volume":[volume]
-        }, index=[minute_ts])
-
-        # Append
-        self.historical_data[symbol] = pd.concat(
-            [self.historical_data[symbol], new_bar]
+        prices, vols = ticks
+        open_p  = float(prices[0])
+        high_p  = float(prices.max())
+        low_p   = float(prices.min())
+        close_p = float(prices[-1])
+        volume  = int(vols.sum())
+
+        # Advance indicators by this single bar instead of recomputing history
+        bars = self._bars[symbol]
+        ind = self._ind_state[symbol].update(
+            high_p, low_p, close_p, volume, self._session_id(minute_id)
         )
 
-        # Data integrity checks
-        hist = self.historical_data[symbol]
-        if len(hist) >= 2:
-            prev_ts = hist.index[-2]
-            prev_close = hist["close"].iloc[-2]
+        # Data integrity checks against the previous bar
+        if bars.last_ts_ns is not None:
+            prev_id = bars.last_ts_ns // NS_PER_MINUTE
+            prev_close = bars.last_close
 
             # Gap check
-            if (minute_ts - prev_ts) > timedelta(minutes=1):
+            if minute_id - prev_id > 1:
                 logger.warning(
-                    f"[DATA] {symbol}: gap {prev_ts.isoformat()} → {minute_ts.isoformat()}"
+                    "[DATA] %s: gap %s → %s", symbol,
+                    self._minute_dt(prev_id).isoformat(), self._minute_dt(minute_id).isoformat()
                 )
 
             # Outlier check
             jump_pct = abs((close_p - prev_close) / prev_close)
             if jump_pct > 0.10:
                 logger.warning(
-                    f"[DATA] {symbol}: outlier @ {minute_ts.isoformat()}, jump {jump_pct*100:.1f}%"
+                    "[DATA] %s: outlier @ %s, jump %.1f%%",
+                    symbol, self._minute_dt(minute_id).isoformat(), jump_pct * 100
                 )
 
-        # Update last_timestamp if not set
-        if self.last_timestamp[symbol] is None:
-            self.last_timestamp[symbol] = minute_ts
+        # Append: one indexed store into the preallocated buffer
+        bars.append(
+            minute_id * NS_PER_MINUTE,
+            [open_p, high_p, low_p, close_p, volume] + [ind[col] for col in BAR_COLUMNS[5:]]
+        )
 
         # Prune old bars
         self._prune_old_bars(symbol)
 
-        # Recompute indicators on the updated DataFrame slice
-        df_ind = self._compute_all_indicators(self.historical_data[symbol])
-        self.historical_data[symbol] = df_ind
-
-        logger.debug(
-            f"[DATA] {symbol}: 1-min bar added {minute_ts.isoformat()} | close={close_p:.2f}, vol={volume}"
-        )
+        # Runs once per symbol per minute: skip building the message unless enabled
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "[DATA] %s: 1-min bar added %s | close=%.2f, vol=%d",
+                symbol, self._minute_dt(minute_id).isoformat(), close_p, volume
+            )
 
     def _prune_old_bars(self, symbol: str):
         """
         Keep only the last M minutes of history, where M = 3 × max(ema_long, rsi, bb).
         """
-        df = self.historical_data[symbol]
-        if df.empty:
+        bars = self._bars[symbol]
+        if not len(bars):
             return
 
-        latest_ts = df.index.max()
-        lookback_minutes = max(
-            self.config.ema_long_period,
-            self.config.rsi_period,
-            self.config.bb_period
-        ) * 3
-        cutoff = latest_ts - timedelta(minutes=lookback_minutes)
-        self.historical_data[symbol] = df[df.index >= cutoff]
+        bars.prune_before(bars.last_ts_ns - self._lookback_ns)
 
-    def _compute_all_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _compute_all_indicators(
+        self,
+        df: pd.DataFrame,
+        state: Optional[IndicatorState] = None
+    ) -> pd.DataFrame:
         """
         Given a DataFrame with ['open','high','low','close','volume'], compute and append:
           - EMA (short & long)
           - RSI
           - Bollinger Bands (hband, lband, mavg)
-          - VWAP (cumulative)
+          - VWAP (cumulative within each market-tz trading day)
           - ATR
+        All eight columns come out of one fused kernel pass. If 'state' is
+        given it is re-seeded from this history so later bars can be applied
+        incrementally.
         Returns a new DataFrame with added columns.
         """
         if df.empty:
             return df
 
-        df = df.copy()
+        high = np.ascontiguousarray(df["high"].to_numpy(dtype=np.float64))
+        low = np.ascontiguousarray(df["low"].to_numpy(dtype=np.float64))
+        close = np.ascontiguousarray(df["close"].to_numpy(dtype=np.float64))
+        volume = np.ascontiguousarray(df["volume"].to_numpy(dtype=np.float64))
+        # Wall-clock day in the index's tz (same numbering as _session_id)
+        session = df.index.tz_localize(None).as_unit("ns").asi8 // NS_PER_DAY
+        if state is not None:
+            columns = state.seed(high, low, close, volume, session)
+        else:
+            columns = compute_all(
+                high,
+                low,
+                close,
+                volume,
+                self.config.ema_short_period,
+                self.config.ema_long_period,
+                self.config.rsi_period,
+                self.config.bb_period,
+                self.config.bb_std_dev,
+                self.config.atr_period,
+                session,
+            )
+        # Wrap the kernel outputs as-is and join them onto the input columns,
+        # rather than deep-copying the input just to assign into it
+        ind = pd.DataFrame(dict(zip(OUTPUT_COLUMNS, columns)), index=df.index, copy=False)
+        return pd.concat([df.drop(columns=list(OUTPUT_COLUMNS), errors="ignore"), ind], axis=1)
 
-        # EMA
-        df["ema_short"] = compute_ema(df, self.config.ema_short_period)
-        df["ema_long"]  = compute_ema(df, self.config.ema_long_period)
+    def latest_indicators(self, symbol: str) -> dict:
+        """
+        Return the most recent indicator values for 'symbol' from the running
+        state ({'ema_short':..., 'ema_long':..., 'rsi':..., 'bb_hband':...,
+        'bb_lband':..., 'bb_mavg':..., 'vwap':..., 'atr':...}), without touching the DataFrame.
+        Empty dict if no bars have been processed yet.
+        """
+        return dict(self._ind_state[symbol].latest)
+
+    def bar_count(self, symbol: str) -> int:
+        """Number of 1-minute bars currently held (or replayed so far) for 'symbol'."""
+        end = self._replay_end[symbol]
+        return len(self._bars[symbol]) if end is None else end
+
+    def last_close(self, symbol: str) -> float:
+        """Close of the newest (visible) bar for 'symbol' as a float; NaN if there is none."""
+        end = self._replay_end[symbol]
+        bars = self._bars[symbol]
+        if end is None:
+            return bars.last_close
+        return float(bars.column("close")[end - 1]) if end else np.nan
+
+    def last_bar_ts(self, symbol: str) -> Optional[int]:
+        """UTC epoch-ns timestamp of the newest (visible) finalized bar for 'symbol'; None if there is none."""
+        end = self._replay_end[symbol]
+        bars = self._bars[symbol]
+        if end is None:
+            return bars.last_ts_ns
+        return int(bars.timestamps()[end - 1]) if end else None
+
+    def latest(self, symbol: str, k: int = 64) -> IndicatorsView:
+        """
+        Return the last 'k' bars (fewer if not available) of close and every
+        indicator for 'symbol' as zero-copy NumPy views into the bar buffer.
+        Rows already stored are never rewritten, so the views stay valid.
+        """
+        bars = self._bars[symbol]
+        window = self._window(symbol, k)
+        return IndicatorsView(
+            bars.timestamps()[window],
+            *(bars.column(name)[window] for name in IndicatorsView._fields[1:])
+        )
 
-        # RSI
-        df["rsi"] = compute_rsi(df, self.config.rsi_period)
+    def latest_columns(self, symbol: str, k: int) -> dict:
+        """
+        Return the last 'k' bars of every column in BAR_COLUMNS as
+        {column: zero-copy NumPy view}, e.g. for serializing a feature window.
+        """
+        bars = self._bars[symbol]
+        window = self._window(symbol, k)
+        return {name: bars.column(name)[window] for name in BAR_COLUMNS}
 
-        # Bollinger Bands
-        hband, lband, mavg = compute_bb(
-            df, self.config.bb_period, self.config.bb_std_dev
-        )
-        df["bb_hband"], df["bb_lband"], df["bb_mavg"] = hband, lband, mavg
+    def latest_rows(self, symbol: str, columns: tuple, k: int = 2) -> list:
+        """
+        Return the last 'k' bars of 'symbol' (oldest first) as tuples of plain
+        floats in 'columns' order, e.g. `prev, cur = latest_rows(symbol, cols)`.
+        One tolist() over the bar block plus an itemgetter per row, so the
+        caller unpacks scalars without per-column NumPy indexing.
+        """
+        getter = _row_getter(columns)
+        rows = self._bars[symbol].block(self._window(symbol, k)).T.tolist()
+        return [getter(row) for row in rows]
 
-        # VWAP (cumulative)
-        df["vwap"] = compute_vwap(df)
+    def latest_matrix(self, symbols, columns, k: int = 2) -> np.ndarray:
+        """
+        Return the last 'k' bars of 'columns' for every symbol in 'symbols'
+        stacked into one (k, len(symbols), len(columns)) array, oldest bar
+        first, so e.g. `prev, cur = latest_matrix(symbols, cols)` gives
+        (N, C) blocks for cross-symbol NumPy expressions. Symbols with fewer
+        than 'k' bars are NaN-padded at the front.
+        """
+        # Plain slice copies per symbol; the column selection is one fancy index at the end
+        out = np.full((k, len(symbols), len(BAR_COLUMNS)), np.nan)
+        for i, symbol in enumerate(symbols):
+            block = self._bars[symbol].block(self._window(symbol, k))
+            m = block.shape[1]
+            if m:
+                out[k - m:, i, :] = block.T
+        return out[:, :, [_COL[name] for name in columns]]
+
+    def _window(self, symbol: str, k: int) -> slice:
+        """Slice of the last 'k' visible bars (empty if k <= 0)."""
+        end = self.bar_count(symbol)
+        return slice(max(end - k, 0) if k > 0 else end, end)
 
-        # ATR
-        df["atr"] = compute_atr(df, self.config.atr_period)
+    # -------------------------------------------------------------------------
+    # Backtest replay: walk the stored history bar by bar without copying it
+    # -------------------------------------------------------------------------
+    def bar_timestamps(self, symbol: str) -> np.ndarray:
+        """Zero-copy view of every stored bar's UTC epoch-ns timestamp (ignores the replay cursor)."""
+        return self._bars[symbol].timestamps()
 
-        return df
+    def set_replay_end(self, symbol: str, n: Optional[int]):
+        """
+        Make only the first 'n' stored bars of 'symbol' visible to bar_count(),
+        latest(), latest_columns() and compute_indicators(), so signals can be
+        evaluated at any historical bar. None shows every bar again.
+        """
+        self._replay_end[symbol] = n
 
     def compute_indicators(self, symbol: str) -> pd.DataFrame:
         """
         Return the current 1-minute bar DataFrame for 'symbol', including all indicators.
+        Legacy/backtest API: strategy code only needing recent values should
+        use latest(), which does not copy.
+
+        The snapshot is memoized until the bar store changes (a new bar, a prune
+        or a replay step); each call still returns its own copy of it, so a
+        caller mutating the result cannot affect other callers within the bar.
         """
-        return self.historical_data[symbol].copy()
\ No newline at end of file
+        end = self._replay_end[symbol]
+        key = (self._bars[symbol].version, end)
+        cached = self._frame_memo.get(symbol)
+        if cached is not None and cached[0] == key:
+            return cached[1].copy()
+        df = self.historical_data[symbol]
+        df = df.copy() if end is None else df.iloc[:end].copy()
+        self._frame_memo[symbol] = (key, df)
+        return df.copy()
\ No newline at end of file
@@ -1,7 +1,28 @@
+import numpy as np
 import pandas as pd
-from ta.trend import EMAIndicator
-from ta.momentum import RSIIndicator
-from ta.volatility import BollingerBands, AverageTrueRange
+
+from src.indicators_nb import (
+    NUMBA_AVAILABLE, atr_kernel, bb_kernel, ema_kernel, rsi_kernel, vwap_kernel
+)
+
+# With Numba, every indicator runs as a compiled kernel from indicators_nb.
+# Without it, EMA/RSI/BB use pandas (plus bottleneck, if installed) instead
+# of the kernels' plain-Python loops. Both reproduce the `ta` definitions
+# exactly (same warm-up NaNs, adjust=False smoothing, population std-dev).
+try:
+    import bottleneck as bn
+except ImportError:
+    bn = None
+
+
+def _values(series: pd.Series) -> np.ndarray:
+    """Contiguous float64 array for the kernels."""
+    return np.ascontiguousarray(series.to_numpy(dtype=np.float64))
+
+
+def _nan_series(df: pd.DataFrame) -> pd.Series:
+    """All-NaN result for inputs still inside an indicator's warm-up."""
+    return pd.Series(np.full(len(df), np.nan), index=df.index)
 
 
 def compute_ema(df: pd.DataFrame, span: int) -> pd.Series:
@@ -17,7 +38,11 @@ def compute_ema(df: pd.DataFrame, span: int) -> pd.Series:
     """
     if df.empty or "close" not in df:
         return pd.Series(dtype=float, index=df.index)
-    return EMAIndicator(close=df["close"], window=span).ema_indicator()
+    if len(df) < span:
+        return _nan_series(df)
+    if NUMBA_AVAILABLE:
+        return pd.Series(ema_kernel(_values(df["close"]), span), index=df.index)
+    return df["close"].ewm(span=span, min_periods=span, adjust=False).mean()
 
 
 def compute_rsi(df: pd.DataFrame, period: int) -> pd.Series:
@@ -33,7 +58,24 @@ def compute_rsi(df: pd.DataFrame, period: int) -> pd.Series:
     """
     if df.empty or "close" not in df:
         return pd.Series(dtype=float, index=df.index)
-    return RSIIndicator(close=df["close"], window=period).rsi()
+    if len(df) < period:
+        return _nan_series(df)
+    if NUMBA_AVAILABLE:
+        return pd.Series(rsi_kernel(_values(df["close"]), period), index=df.index)
+
+    close = df["close"].to_numpy(dtype=np.float64)
+    diff = np.diff(close, prepend=close[0])  # first diff counts as zero
+    # Comparisons, not np.maximum: a NaN diff counts as no move (as in ta)
+    gains = pd.Series(np.where(diff > 0.0, diff, 0.0), index=df.index)
+    losses = pd.Series(np.where(diff < 0.0, -diff, 0.0), index=df.index)
+
+    # Wilder smoothing: EWMA with alpha = 1/period
+    avg_gain = gains.ewm(alpha=1.0 / period, min_periods=period, adjust=False).mean()
+    avg_loss = losses.ewm(alpha=1.0 / period, min_periods=period, adjust=False).mean()
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return rsi.where(avg_loss != 0, 100.0).where(avg_loss.notna())
 
 
 def compute_bb(df: pd.DataFrame, period: int, dev: float) -> (pd.Series, pd.Series, pd.Series):
@@ -51,11 +93,28 @@ def compute_bb(df: pd.DataFrame, period: int, dev: float) -> (pd.Series, pd.Seri
     if df.empty or "close" not in df:
         empty = pd.Series(dtype=float, index=df.index)
         return empty, empty, empty
-
-    bb = BollingerBands(close=df["close"], window=period, window_dev=dev)
-    hband = bb.bollinger_hband()
-    lband = bb.bollinger_lband()
-    mavg = bb.bollinger_mavg()
+    if len(df) < period:
+        return _nan_series(df), _nan_series(df), _nan_series(df)
+
+    close = _values(df["close"])
+    if NUMBA_AVAILABLE:
+        hband, lband, mavg = bb_kernel(close, period, dev)
+        return (
+            pd.Series(hband, index=df.index),
+            pd.Series(lband, index=df.index),
+            pd.Series(mavg, index=df.index),
+        )
+    if bn is not None:
+        mu = bn.move_mean(close, window=period, min_count=period)
+        sd = bn.move_std(close, window=period, min_count=period, ddof=0)
+    else:
+        rolling = df["close"].rolling(period, min_periods=period)
+        mu = rolling.mean().to_numpy()
+        sd = rolling.std(ddof=0).to_numpy()
+
+    hband = pd.Series(mu + dev * sd, index=df.index)
+    lband = pd.Series(mu - dev * sd, index=df.index)
+    mavg = pd.Series(mu, index=df.index)
     return hband, lband, mavg
 
 
@@ -71,6 +130,8 @@ def compute_vwap(df: pd.DataFrame) -> pd.Series:
     """
     if df.empty or any(col not in df for col in ("close", "volume")):
         return pd.Series(dtype=float, index=df.index)
+    if NUMBA_AVAILABLE:
+        return pd.Series(vwap_kernel(_values(df["close"]), _values(df["volume"])), index=df.index)
     cumulative_pv = (df["close"] * df["volume"]).cumsum()
     cumulative_vol = df["volume"].cumsum()
     return cumulative_pv / cumulative_vol
@@ -89,5 +150,8 @@ def compute_atr(df: pd.DataFrame, period: int) -> pd.Series:
     """
     if df.empty or any(col not in df for col in ("high", "low", "close")):
         return pd.Series(dtype=float, index=df.index)
-    atr = AverageTrueRange(high=df["high"], low=df["low"], close=df["close"], window=period)
-    return atr.average_true_range()
\ No newline at end of file
+    if len(df) < period:
+        return pd.Series(np.zeros(len(df)), index=df.index)  # ta's warm-up value
+    # Same Wilder recursion as ta's AverageTrueRange (a Python loop there too)
+    atr = atr_kernel(_values(df["high"]), _values(df["low"]), _values(df["close"]), period)
+    return pd.Series(atr, index=df.index)
\ No newline at end of file
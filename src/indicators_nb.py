@@ -0,0 +1,505 @@
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+
+# -----------------------------------------------------------------------------
+# Numba is optional: without it the kernels below run as plain Python loops
+# (correct, just slower), so backtests still work on a bare install.
+# -----------------------------------------------------------------------------
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fn: fn
+
+
+# -----------------------------------------------------------------------------
+# Running-state layout shared by compute_all() and IndicatorState.
+# A flat float64 vector keeps the state numba-friendly.
+# -----------------------------------------------------------------------------
+_COUNT      = 0   # bars processed so far
+_EMA_S      = 1
+_EMA_L      = 2
+_PREV_CLOSE = 3
+_AVG_GAIN   = 4
+_AVG_LOSS   = 5
+_BB_MEAN    = 6
+_BB_M2      = 7
+_CUM_PV     = 8
+_CUM_V      = 9
+_TR_SUM     = 10  # true-range sum during the ATR warm-up
+_ATR        = 11
+_SESSION    = 12  # trading-day id the VWAP sums belong to
+STATE_SIZE  = 13
+
+# Output row order of _advance() / compute_all()
+OUTPUT_COLUMNS = (
+    "ema_short", "ema_long", "rsi",
+    "bb_hband", "bb_lband", "bb_mavg",
+    "vwap", "atr",
+)
+
+
+# Explicit signature: compiled (or loaded from the on-disk cache) at import
+# time rather than on the first bar. Input arrays are typed read-only so
+# pandas' read-only views are accepted too; all arrays must be C-contiguous.
+if NUMBA_AVAILABLE:
+    from numba import types as nbt
+
+    _IN_F8 = nbt.Array(nbt.float64, 1, "C", readonly=True)
+    _IN_I8 = nbt.Array(nbt.int64, 1, "C", readonly=True)
+    _ADVANCE_SIG = nbt.void(
+        _IN_F8, _IN_F8, _IN_F8, _IN_F8, _IN_I8,                     # high, low, close, volume, session
+        nbt.int64, nbt.int64, nbt.int64, nbt.int64, nbt.float64, nbt.int64,   # periods, bb_k
+        nbt.float64, nbt.float64, nbt.float64, nbt.float64, nbt.float64,      # alphas, 1/bb_n
+        nbt.float64[::1], nbt.float64[::1], nbt.float64[:, ::1],    # state, window, out
+    )
+else:
+    _ADVANCE_SIG = None
+
+
+@njit(_ADVANCE_SIG, cache=True, boundscheck=False)
+def _advance(high, low, close, volume, session, ema_s, ema_l, rsi_n, bb_n, bb_k, atr_n,
+             alpha_s, alpha_l, alpha_rsi, alpha_atr, inv_bb, state, window, out):
+    """
+    Feed the bars through the running state in a single pass, writing one
+    column of 'out' (shape (8, len(close))) per bar. 'session' holds each
+    bar's trading-day id; VWAP restarts whenever it changes. 'window' is a
+    ring holding the last bb_n closes for the sliding Bollinger window. The
+    periods only decide the warm-up; smoothing and averaging use the
+    precomputed alphas / 1/bb_n, so the loop multiplies instead of divides.
+    """
+    count = int(state[_COUNT])
+    es = state[_EMA_S]
+    el = state[_EMA_L]
+    prev_close = state[_PREV_CLOSE]
+    avg_gain = state[_AVG_GAIN]
+    avg_loss = state[_AVG_LOSS]
+    bb_mean = state[_BB_MEAN]
+    bb_m2 = state[_BB_M2]
+    cum_pv = state[_CUM_PV]
+    cum_v = state[_CUM_V]
+    tr_sum = state[_TR_SUM]
+    atr = state[_ATR]
+    cur_session = state[_SESSION]
+
+    for j in range(close.shape[0]):
+        c = close[j]
+
+        # True range needs the previous close, so take it before it moves on
+        tr = high[j] - low[j]
+        if count > 0:
+            tr = max(tr, abs(high[j] - prev_close), abs(low[j] - prev_close))
+
+        # EMA (adjust=False recursion seeded with the first close)
+        if count == 0:
+            es = c
+            el = c
+        else:
+            es = alpha_s * c + (1.0 - alpha_s) * es
+            el = alpha_l * c + (1.0 - alpha_l) * el
+
+            # Wilder-smoothed gains / losses (first diff counts as zero)
+            diff = c - prev_close
+            gain = diff if diff > 0.0 else 0.0
+            loss = -diff if diff < 0.0 else 0.0
+            avg_gain = alpha_rsi * gain + (1.0 - alpha_rsi) * avg_gain
+            avg_loss = alpha_rsi * loss + (1.0 - alpha_rsi) * avg_loss
+        prev_close = c
+
+        out[0, j] = es if count >= ema_s - 1 else np.nan
+        out[1, j] = el if count >= ema_l - 1 else np.nan
+        if count >= rsi_n - 1:
+            if avg_loss == 0.0:
+                out[2, j] = 100.0
+            else:
+                out[2, j] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        else:
+            out[2, j] = np.nan
+
+        # Bollinger: Welford mean / M2 over a sliding window of bb_n closes
+        slot = count % bb_n
+        if count < bb_n:
+            delta = c - bb_mean
+            bb_mean += delta / (count + 1)
+            bb_m2 += delta * (c - bb_mean)
+        else:
+            old = window[slot]
+            new_mean = bb_mean + (c - old) * inv_bb
+            bb_m2 += (c - old) * (c - new_mean + old - bb_mean)
+            bb_mean = new_mean
+        window[slot] = c
+        if count >= bb_n - 1:
+            var = bb_m2 * inv_bb
+            std = np.sqrt(var) if var > 0.0 else 0.0
+            out[3, j] = bb_mean + bb_k * std
+            out[4, j] = bb_mean - bb_k * std
+            out[5, j] = bb_mean
+        else:
+            out[3, j] = np.nan
+            out[4, j] = np.nan
+            out[5, j] = np.nan
+
+        # VWAP (cumulative within the trading day)
+        if count == 0 or session[j] != cur_session:
+            cum_pv = 0.0
+            cum_v = 0.0
+            cur_session = session[j]
+        cum_pv += c * volume[j]
+        cum_v += volume[j]
+        out[6, j] = cum_pv / cum_v if cum_v != 0.0 else np.nan
+
+        # ATR (Wilder; zeros during warm-up, then the mean TR at bar atr_n-1)
+        if count + 1 < atr_n:
+            tr_sum += tr
+            out[7, j] = 0.0
+        elif count + 1 == atr_n:
+            tr_sum += tr
+            atr = tr_sum * alpha_atr
+            out[7, j] = atr
+        else:
+            atr = (atr * (atr_n - 1) + tr) * alpha_atr
+            out[7, j] = atr
+
+        count += 1
+
+    state[_COUNT] = count
+    state[_EMA_S] = es
+    state[_EMA_L] = el
+    state[_PREV_CLOSE] = prev_close
+    state[_AVG_GAIN] = avg_gain
+    state[_AVG_LOSS] = avg_loss
+    state[_BB_MEAN] = bb_mean
+    state[_BB_M2] = bb_m2
+    state[_CUM_PV] = cum_pv
+    state[_CUM_V] = cum_v
+    state[_TR_SUM] = tr_sum
+    state[_ATR] = atr
+    state[_SESSION] = cur_session
+
+
+def compute_all(high, low, close, volume, ema_s, ema_l, rsi_n, bb_n, bb_k, atr_n,
+                session=None):
+    """
+    Compute EMA (short & long), RSI, Bollinger Bands, VWAP and ATR in one
+    fused pass over the bars.
+
+    Results match the `ta` indicators used by indicators.py (same warm-up NaNs,
+    Wilder smoothing for RSI and ATR, population std-dev for the bands).
+
+    Args:
+        high, low, close: Contiguous float64 price arrays (same length).
+        volume: Contiguous float64 array of volumes.
+        ema_s:  Short EMA span (integer).
+        ema_l:  Long EMA span (integer).
+        rsi_n:  RSI lookback period (integer).
+        bb_n:   Bollinger Bands window (integer).
+        bb_k:   Number of standard deviations for the bands (float).
+        atr_n:  ATR period (integer).
+        session: Optional int64 trading-day id per bar; VWAP resets when it
+                 changes. None keeps one cumulative VWAP over the whole input.
+
+    Returns:
+        Tuple of eight float64 arrays:
+        (ema_short, ema_long, rsi, bb_hband, bb_lband, bb_mavg, vwap, atr).
+    """
+    state = np.zeros(STATE_SIZE)
+    window = np.zeros(bb_n)
+    out = np.empty((len(OUTPUT_COLUMNS), close.shape[0]))
+    if session is None:
+        session = np.zeros(close.shape[0], dtype=np.int64)
+    _advance(
+        high, low, close, volume, session, ema_s, ema_l, rsi_n, bb_n, bb_k, atr_n,
+        2.0 / (ema_s + 1), 2.0 / (ema_l + 1), 1.0 / rsi_n, 1.0 / atr_n, 1.0 / bb_n,
+        state, window, out
+    )
+    return tuple(out)
+
+
+@dataclass
+class IndicatorState:
+    """
+    Running EMA / RSI / Bollinger / VWAP / ATR state for one symbol.
+
+    seed() runs the batch kernel over the loaded history once; afterwards
+    update() advances every indicator by a single bar in O(1).
+    Alphas default to 2/(n+1) for the EMAs and 1/n (Wilder) for RSI and ATR;
+    they are fixed per run, so they are worked out once here.
+    """
+    ema_s: int
+    ema_l: int
+    rsi_n: int
+    bb_n:  int
+    bb_k:  float
+    atr_n: int = 14
+    alpha_s:   Optional[float] = None
+    alpha_l:   Optional[float] = None
+    alpha_rsi: Optional[float] = None
+    alpha_atr: Optional[float] = None
+    inv_bb: float = field(init=False, repr=False)
+    state:  np.ndarray = field(init=False, repr=False)
+    window: np.ndarray = field(init=False, repr=False)
+    latest: dict = field(init=False, default_factory=dict)
+    # update()'s one-bar input rows (high, low, close, volume), session id
+    # and output column, allocated once and overwritten on every bar
+    _bar:     np.ndarray = field(init=False, repr=False)
+    _session: np.ndarray = field(init=False, repr=False)
+    _out:     np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self):
+        if self.alpha_s is None:
+            self.alpha_s = 2.0 / (self.ema_s + 1)
+        if self.alpha_l is None:
+            self.alpha_l = 2.0 / (self.ema_l + 1)
+        if self.alpha_rsi is None:
+            self.alpha_rsi = 1.0 / self.rsi_n
+        if self.alpha_atr is None:
+            self.alpha_atr = 1.0 / self.atr_n
+        self.inv_bb = 1.0 / self.bb_n
+        self._bar = np.empty((4, 1))
+        self._session = np.empty(1, dtype=np.int64)
+        self._out = np.empty((len(OUTPUT_COLUMNS), 1))
+        self.reset()
+
+    def reset(self):
+        """Forget all history (e.g. when a symbol's data is reloaded)."""
+        self.state = np.zeros(STATE_SIZE)
+        self.window = np.zeros(self.bb_n)
+        self.latest = {}
+
+    def seed(self, high: np.ndarray, low: np.ndarray, close: np.ndarray,
+             volume: np.ndarray, session: Optional[np.ndarray] = None) -> tuple:
+        """
+        Reset, then process a full history. Returns the same eight arrays as
+        compute_all() and leaves the state positioned after the last bar.
+        """
+        self.reset()
+        out = np.empty((len(OUTPUT_COLUMNS), close.shape[0]))
+        if session is None:
+            session = np.zeros(close.shape[0], dtype=np.int64)
+        _advance(
+            high, low, close, volume, session,
+            self.ema_s, self.ema_l, self.rsi_n, self.bb_n, self.bb_k, self.atr_n,
+            self.alpha_s, self.alpha_l, self.alpha_rsi, self.alpha_atr, self.inv_bb,
+            self.state, self.window, out
+        )
+        if close.shape[0]:
+            self.latest = dict(zip(OUTPUT_COLUMNS, out[:, -1].tolist()))
+        return tuple(out)
+
+    def update(self, high: float, low: float, close: float, volume: float,
+               session: int = 0) -> dict:
+        """
+        Advance all indicators by one bar and return the new values
+        keyed by column name (see OUTPUT_COLUMNS). 'session' is the bar's
+        trading-day id (same numbering as seed()); VWAP restarts on a new one.
+        """
+        bar = self._bar
+        bar[0, 0] = high
+        bar[1, 0] = low
+        bar[2, 0] = close
+        bar[3, 0] = volume
+        self._session[0] = session
+        out = self._out
+        _advance(
+            bar[0], bar[1], bar[2], bar[3], self._session,
+            self.ema_s, self.ema_l, self.rsi_n, self.bb_n, self.bb_k, self.atr_n,
+            self.alpha_s, self.alpha_l, self.alpha_rsi, self.alpha_atr, self.inv_bb,
+            self.state, self.window, out
+        )
+        self.latest = dict(zip(OUTPUT_COLUMNS, out[:, 0].tolist()))
+        return self.latest
+
+
+# -----------------------------------------------------------------------------
+# Standalone ATR (Wilder), matching ta.volatility.AverageTrueRange: zeros
+# during warm-up, the mean true range at bar atr_n-1, then (atr*(n-1) + tr) / n.
+# State: [bars seen, warm-up TR sum, last ATR, previous close]
+# -----------------------------------------------------------------------------
+ATR_STATE_SIZE = 4
+
+
+@njit(cache=True)
+def _advance_atr(high, low, close, atr_n, state, out):
+    """Feed bars through the ATR state, writing one ATR value per bar to 'out'."""
+    count = int(state[0])
+    tr_sum = state[1]
+    atr = state[2]
+    prev_close = state[3]
+
+    for j in range(close.shape[0]):
+        tr = high[j] - low[j]
+        if count > 0:
+            tr = max(tr, abs(high[j] - prev_close), abs(low[j] - prev_close))
+        prev_close = close[j]
+        count += 1
+
+        if count < atr_n:
+            tr_sum += tr
+            out[j] = 0.0
+        elif count == atr_n:
+            tr_sum += tr
+            atr = tr_sum / atr_n
+            out[j] = atr
+        else:
+            atr = (atr * (atr_n - 1) + tr) / atr_n
+            out[j] = atr
+
+    state[0] = count
+    state[1] = tr_sum
+    state[2] = atr
+    state[3] = prev_close
+
+
+# -----------------------------------------------------------------------------
+# Single-indicator kernels behind indicators.py's compute_* functions.
+# Same definitions (and warm-up NaNs) as the fused kernel above, and the same
+# handling of NaN inputs as the pandas versions they replace, so results do
+# not depend on whether Numba is installed. No fastmath anywhere in this
+# module: it would let the compiler assume NaN never occurs.
+# -----------------------------------------------------------------------------
+@njit(cache=True)
+def ema_kernel(close, span):
+    """
+    EMA with adjust=False, exactly pandas' ewm(span, min_periods=span,
+    adjust=False) recursion: NaN closes carry the previous value forward
+    (the old weight keeps decaying across the gap) and only non-NaN closes
+    count towards min_periods.
+    """
+    n = close.shape[0]
+    out = np.empty(n)
+    alpha = 2.0 / (span + 1.0)
+    beta = 1.0 - alpha
+    ema = np.nan
+    old_wt = 1.0
+    nobs = 0
+    for i in range(n):
+        c = close[i]
+        is_obs = c == c
+        if is_obs:
+            nobs += 1
+        if ema == ema:
+            old_wt *= beta
+            if is_obs:
+                if ema != c:
+                    ema = (old_wt * ema + alpha * c) / (old_wt + alpha)
+                old_wt = 1.0
+        elif is_obs:
+            ema = c
+        out[i] = ema if nobs >= span else np.nan
+    return out
+
+
+@njit(cache=True)
+def rsi_kernel(close, period):
+    """Wilder RSI (alpha = 1/period), NaN before index period-1."""
+    n = close.shape[0]
+    out = np.empty(n)
+    alpha = 1.0 / period
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(n):
+        if i > 0:
+            diff = close[i] - close[i - 1]
+            gain = diff if diff > 0.0 else 0.0
+            loss = -diff if diff < 0.0 else 0.0
+            avg_gain = alpha * gain + (1.0 - alpha) * avg_gain
+            avg_loss = alpha * loss + (1.0 - alpha) * avg_loss
+        if i < period - 1:
+            out[i] = np.nan
+        elif avg_loss == 0.0:
+            out[i] = 100.0
+        else:
+            out[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return out
+
+
+@njit(cache=True)
+def bb_kernel(close, period, dev):
+    """
+    Bollinger (hband, lband, mavg) over a sliding window, population std-dev.
+    Like pandas' rolling(period), a window containing a NaN close yields
+    NaN; once the last NaN leaves, mean / M2 restart from the window.
+    """
+    n = close.shape[0]
+    hband = np.empty(n)
+    lband = np.empty(n)
+    mavg = np.empty(n)
+    mean = 0.0
+    m2 = 0.0
+    nans = 0        # NaN closes in the current window
+    stale = False   # mean / m2 invalidated by a NaN
+    for i in range(n):
+        c = close[i]
+        if c != c:
+            nans += 1
+        if i >= period and close[i - period] != close[i - period]:
+            nans -= 1
+        if nans > 0:
+            stale = True
+        elif stale:
+            # i >= period here: restart Welford over the NaN-free window
+            mean = 0.0
+            m2 = 0.0
+            for k in range(period):
+                x = close[i - period + 1 + k]
+                delta = x - mean
+                mean += delta / (k + 1)
+                m2 += delta * (x - mean)
+            stale = False
+        elif i < period:
+            delta = c - mean
+            mean += delta / (i + 1)
+            m2 += delta * (c - mean)
+        else:
+            old = close[i - period]
+            new_mean = mean + (c - old) / period
+            m2 += (c - old) * (c - new_mean + old - mean)
+            mean = new_mean
+        if i >= period - 1 and nans == 0:
+            var = m2 / period
+            std = np.sqrt(var) if var > 0.0 else 0.0
+            hband[i] = mean + dev * std
+            lband[i] = mean - dev * std
+            mavg[i] = mean
+        else:
+            hband[i] = np.nan
+            lband[i] = np.nan
+            mavg[i] = np.nan
+    return hband, lband, mavg
+
+
+@njit(cache=True)
+def vwap_kernel(close, volume):
+    """
+    Cumulative VWAP; NaN while cumulative volume is zero. As with pandas'
+    cumsum, a NaN price or volume gives NaN on that bar only and is left
+    out of the running sums (a bar's volume still counts if only its price
+    is missing).
+    """
+    n = close.shape[0]
+    out = np.empty(n)
+    cum_pv = 0.0
+    cum_v = 0.0
+    for i in range(n):
+        v = volume[i]
+        pv = close[i] * v
+        if pv == pv:
+            cum_pv += pv
+        if v == v:
+            cum_v += v
+        out[i] = cum_pv / cum_v if pv == pv and cum_v != 0.0 else np.nan
+    return out
+
+
+def atr_kernel(high, low, close, period):
+    """Wilder ATR over full arrays (see _advance_atr)."""
+    out = np.empty(close.shape[0])
+    _advance_atr(high, low, close, period, np.zeros(ATR_STATE_SIZE), out)
+    return out
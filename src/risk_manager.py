@@ -1,19 +1,37 @@
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
+import numpy as np
 import pandas as pd
 
 from src.config import Config
 
 logger = logging.getLogger(__name__)
 
+# Closed-trade record layout: one NumPy column per field (see RiskManager._th)
+TRADE_FIELDS = (
+    ("symbol",       object),
+    ("entry_time",   "datetime64[ns]"),
+    ("exit_time",    "datetime64[ns]"),
+    ("entry_price",  np.float64),
+    ("exit_price",   np.float64),
+    ("quantity",     np.int64),
+    ("pnl",          np.float64),
+    ("equity_after", np.float64),
+)
+
 
 class Position:
     """
     Stores information about an individual position and checks for stop-loss / take-profit.
     """
 
+    __slots__ = (
+        "symbol", "entry_price", "quantity", "stop_loss_price",
+        "take_profit_price", "entry_time", "is_open",
+    )
+
     def __init__(
         self,
         symbol: str,
@@ -45,8 +63,9 @@ class RiskManager:
     Key features:
       - Volatility‐adjusted position sizing (ATR‐based, fallback to percent‐based).
       - Dynamic stop-loss / take-profit (ATR‐based multipliers, fallback to config percentages).
-      - Tracks trade_history for each closed trade.
-      - Computes equity curve & drawdown from trade_history.
+      - Tracks every closed trade in columnar arrays (trade_history
+        materializes them as a list of dicts on demand).
+      - Computes equity curve & drawdown from the trade columns.
       - Enforces daily target return and daily max drawdown.
     """
 
@@ -59,27 +78,64 @@ class RiskManager:
 
         # 2) Currently open positions: {symbol: Position}
         self.positions: Dict[str, Position] = {}
-
-        # 3) List of closed trade records (for equity curve)
-        self.trade_history: List[dict] = []
+        #    Stop-loss / take-profit levels of the open ones as parallel arrays
+        #    (slot i ↔ _open_syms[i]), so check_exits() is one vector compare
+        self._open_syms: List[str] = []
+        self._open_idx: Dict[str, int] = {}
+        self._sl_arr = np.empty(16)
+        self._tp_arr = np.empty(16)
+
+        # 3) Closed trade records as parallel columns (TRADE_FIELDS); the
+        #    first _th_n rows are valid, capacity doubles when full
+        self._th: Dict[str, np.ndarray] = {
+            name: np.empty(64, dtype=dtype) for name, dtype in TRADE_FIELDS
+        }
+        self._th_n = 0
 
         # 4) Daily starting capital (reset at start of each trading day)
         self.daily_starting_capital = self.config.initial_capital
 
+        # 5) Running equity peak and worst peak-to-trough drawdown so far,
+        #    advanced per closed trade so get_current_drawdown() is O(1)
+        self._peak_equity = self.daily_starting_capital
+        self._max_drawdown = 0.0
+
+        # 6) Latest ATR per symbol, keyed by the bar (epoch ns) it was read from
+        self._atr_cache: Dict[str, Tuple[int, float]] = {}
+
+        # 7) Sizing / limit constants, fixed for the run (percentages as fractions)
+        self._atr_stop_mult = getattr(self.config, "atr_stop_multiplier", 1.0)
+        self._atr_take_mult = getattr(self.config, "atr_take_multiplier", 2.0)
+        self._max_position_pct = self.config.max_position_pct
+        self._sl_factor = 1.0 - self.config.stop_loss_pct / 100.0
+        self._tp_factor = 1.0 + self.config.take_profit_pct / 100.0
+        self._dd_limit = self.config.daily_max_loss_pct / 100.0
+        self._target_return = self.config.target_daily_return_pct / 100.0
+
     def _get_latest_atr(self, symbol: str) -> Optional[float]:
         """
-        Retrieves the most recent ATR from DataHandler.historical_data[symbol]['atr'].
-        Returns None if ATR is unavailable or the DataFrame is empty.
+        Retrieves the most recent ATR for 'symbol' from the DataHandler's bar store.
+        Returns None if ATR is unavailable or there are no bars yet.
+        The value is cached per bar, so repeat lookups within a minute are O(1).
         """
         dh = getattr(self.config, "_data_handler_ref", None)
         if dh is None:
             return None
 
-        df = dh.historical_data.get(symbol)
-        if df is None or df.empty or "atr" not in df.columns:
+        try:
+            view = dh.latest(symbol, k=1)
+        except KeyError:
+            return None
+        if not len(view.ts):
             return None
 
-        return df["atr"].iloc[-1]
+        ts = int(view.ts[-1])
+        cached = self._atr_cache.get(symbol)
+        if cached is not None and cached[0] == ts:
+            return cached[1]
+        atr = float(view.atr[-1])
+        self._atr_cache[symbol] = (ts, atr)
+        return atr
 
     def calculate_position_size(self, symbol: str, price: float) -> Optional[tuple]:
         """
@@ -104,90 +160,102 @@ class RiskManager:
         """
         atr = self._get_latest_atr(symbol)
         if atr is not None and atr > 0:
-            atr_stop_mult = getattr(self.config, "atr_stop_multiplier", 1.0)
-            atr_take_mult = getattr(self.config, "atr_take_multiplier", 2.0)
+            atr_stop_mult = self._atr_stop_mult
 
             dollar_risk_per_share = atr * atr_stop_mult
-            max_risk_per_trade = self.capital * self.config.max_position_pct
+            max_risk_per_trade = self.capital * self._max_position_pct
 
             if dollar_risk_per_share <= 0:
-                logger.warning(f"[RISK] Invalid ATR ({atr}) for {symbol}.")
+                logger.warning("[RISK] Invalid ATR (%s) for %s.", atr, symbol)
                 return None
 
             qty = int(max_risk_per_trade // dollar_risk_per_share)
             if qty < 1:
                 logger.warning(
-                    f"[RISK] {symbol}: ATR-based quantity < 1 (ATR={atr:.2f})."
+                    "[RISK] %s: ATR-based quantity < 1 (ATR=%.2f).", symbol, atr
                 )
                 return None
 
             required_cash = price * qty
             if required_cash > self.available_cash:
                 logger.warning(
-                    f"[RISK] {symbol}: Required cash ({required_cash:.2f}) > available cash ({self.available_cash:.2f})."
+                    "[RISK] %s: Required cash (%.2f) > available cash (%.2f).",
+                    symbol, required_cash, self.available_cash
                 )
                 return None
 
             sl_price = price - atr * atr_stop_mult
-            tp_price = price + atr * atr_take_mult
+            tp_price = price + atr * self._atr_take_mult
             return qty, sl_price, tp_price
 
         # Fallback to percent-based sizing
-        max_value = self.capital * self.config.max_position_pct
+        max_value = self.capital * self._max_position_pct
         qty = int(max_value // price)
         if qty < 1:
-            logger.warning(f"[RISK] {symbol}: Percent-based quantity < 1.")
+            logger.warning("[RISK] %s: Percent-based quantity < 1.", symbol)
             return None
 
         required_cash = price * qty
         if required_cash > self.available_cash:
             logger.warning(
-                f"[RISK] {symbol}: Required cash ({required_cash:.2f}) > available cash ({self.available_cash:.2f})."
+                "[RISK] %s: Required cash (%.2f) > available cash (%.2f).",
+                symbol, required_cash, self.available_cash
             )
             return None
 
-        sl_price = price * (1.0 - self.config.stop_loss_pct / 100.0)
-        tp_price = price * (1.0 + self.config.take_profit_pct / 100.0)
+        sl_price = price * self._sl_factor
+        tp_price = price * self._tp_factor
         return qty, sl_price, tp_price
 
-    def can_open_position(self, symbol: str, price: float) -> bool:
+    def can_open_position(self, symbol: str, price: float) -> Optional[tuple]:
         """
         Determines if a new position can be opened:
           1) calculate_position_size() returns valid sizing.
           2) Position value ≤ capital × max_position_pct.
           3) Current drawdown < daily_max_loss_pct.
+        The exposure limit is per trade; cash already tied up in open positions
+        is accounted for through available_cash in calculate_position_size(),
+        so no sum over self.positions is needed here.
+        Returns the sizing (qty, sl_price, tp_price) when all checks pass, so
+        callers can hand it to open_position() instead of sizing twice;
+        None otherwise.
         """
         size_info = self.calculate_position_size(symbol, price)
         if size_info is None:
-            return False
+            return None
 
-        qty, sl_price, tp_price = size_info
-        position_value = price * qty
-        max_value = self.capital * self.config.max_position_pct
+        position_value = price * size_info[0]
+        max_value = self.capital * self._max_position_pct
         if position_value > max_value:
             logger.warning(
-                f"[RISK] {symbol}: Position value {position_value:.2f} > max {max_value:.2f}."
+                "[RISK] %s: Position value %.2f > max %.2f.", symbol, position_value, max_value
             )
-            return False
+            return None
 
         current_drawdown = self.get_current_drawdown()
-        if current_drawdown >= (self.config.daily_max_loss_pct / 100.0):
+        if current_drawdown >= self._dd_limit:
             logger.warning(
-                f"[RISK] {symbol}: Current drawdown {current_drawdown*100:.2f}% ≥ daily max {self.config.daily_max_loss_pct}%."
+                "[RISK] %s: Current drawdown %.2f%% ≥ daily max %s%%.",
+                symbol, current_drawdown * 100, self.config.daily_max_loss_pct
             )
-            return False
+            return None
 
-        return True
+        return size_info
 
-    def open_position(self, symbol: str, price: float):
+    def open_position(
+        self, symbol: str, price: float, size_info: Optional[tuple] = None
+    ) -> Optional[Position]:
         """
         Opens a new position for 'symbol' at 'price':
-          - Calls calculate_position_size to get (qty, sl_price, tp_price).
+          - Uses 'size_info' (qty, sl_price, tp_price) from can_open_position()
+            if given, else calls calculate_position_size.
           - Deducts cash and stores a Position object.
+        Returns the new Position, or None if it could not be sized.
         """
-        size_info = self.calculate_position_size(symbol, price)
         if size_info is None:
-            return
+            size_info = self.calculate_position_size(symbol, price)
+        if size_info is None:
+            return None
 
         qty, sl_price, tp_price = size_info
         entry_time = datetime.utcnow()
@@ -201,13 +269,34 @@ class RiskManager:
             entry_time=entry_time,
         )
         self.positions[symbol] = pos
+        self._track_exit_levels(symbol, sl_price, tp_price)
 
         invested = price * qty
         self.available_cash -= invested
 
         logger.info(
-            f"[RISK] Opened {symbol}: qty={qty}, entry={price:.2f}, SL={sl_price:.2f}, "
-            f"TP={tp_price:.2f}, cash_left={self.available_cash:.2f}"
+            "[RISK] Opened %s: qty=%d, entry=%.2f, SL=%.2f, TP=%.2f, cash_left=%.2f",
+            symbol, qty, price, sl_price, tp_price, self.available_cash
+        )
+        return pos
+
+    def revert_open(self, symbol: str):
+        """
+        Undo open_position() for an entry order that never reached the broker
+        (e.g. SendOrder failed): refund the reserved cash and forget the
+        position. No trade is recorded.
+        """
+        pos = self.positions.get(symbol)
+        if not pos or not pos.is_open:
+            return
+
+        self.available_cash += pos.entry_price * pos.quantity
+        pos.is_open = False
+        del self.positions[symbol]
+        self._untrack_exit_levels(symbol)
+
+        logger.info(
+            "[RISK] Reverted open %s: qty=%d, cash=%.2f", symbol, pos.quantity, self.available_cash
         )
 
     def close_position(self, symbol: str, exit_price: float):
@@ -215,7 +304,7 @@ class RiskManager:
         Closes an existing position for 'symbol' at 'exit_price':
           - Calculates profit = (exit_price − entry_price) × quantity.
           - Updates capital & available_cash.
-          - Records the trade in trade_history.
+          - Records the trade in the trade columns (see trade_history).
         """
         pos = self.positions.get(symbol)
         if not pos or not pos.is_open:
@@ -228,64 +317,139 @@ class RiskManager:
         self.capital += profit
         self.available_cash += exit_price * pos.quantity
         pos.is_open = False
+        self._untrack_exit_levels(symbol)
 
         # Record trade
         equity_after = self.capital
-        trade_record = {
-            "symbol":       symbol,
-            "entry_time":   pos.entry_time,
-            "exit_time":    exit_time,
-            "entry_price":  pos.entry_price,
-            "exit_price":   exit_price,
-            "quantity":     pos.quantity,
-            "pnl":          profit,
-            "equity_after": equity_after,
-        }
-        self.trade_history.append(trade_record)
+        self._record_trade(
+            symbol, pos.entry_time, exit_time, pos.entry_price, exit_price,
+            pos.quantity, profit, equity_after
+        )
+
+        if equity_after > self._peak_equity:
+            self._peak_equity = equity_after
+        else:
+            drawdown = (self._peak_equity - equity_after) / self._peak_equity
+            if drawdown > self._max_drawdown:
+                self._max_drawdown = drawdown
 
         logger.info(
-            f"[RISK] Closed {symbol}: exit={exit_price:.2f}, qty={pos.quantity}, "
-            f"PnL={profit:.2f}, equity={self.capital:.2f}"
+            "[RISK] Closed %s: exit=%.2f, qty=%d, PnL=%.2f, equity=%.2f",
+            symbol, exit_price, pos.quantity, profit, self.capital
         )
 
+    def _track_exit_levels(self, symbol: str, sl_price: float, tp_price: float):
+        """Store an open position's SL/TP in the exit-level arrays (growing them by doubling)."""
+        i = self._open_idx.get(symbol)
+        if i is None:
+            i = len(self._open_syms)
+            if i == self._sl_arr.shape[0]:
+                self._sl_arr = np.concatenate((self._sl_arr, np.empty(i)))
+                self._tp_arr = np.concatenate((self._tp_arr, np.empty(i)))
+            self._open_syms.append(symbol)
+            self._open_idx[symbol] = i
+        self._sl_arr[i] = sl_price
+        self._tp_arr[i] = tp_price
+
+    def _untrack_exit_levels(self, symbol: str):
+        """Drop a closed position's slot; the last slot moves into the hole."""
+        i = self._open_idx.pop(symbol, None)
+        if i is None:
+            return
+        last = len(self._open_syms) - 1
+        if i != last:
+            moved = self._open_syms[last]
+            self._open_syms[i] = moved
+            self._open_idx[moved] = i
+            self._sl_arr[i] = self._sl_arr[last]
+            self._tp_arr[i] = self._tp_arr[last]
+        self._open_syms.pop()
+
+    def check_exits(self, current_prices: Dict[str, float]) -> List[Tuple[str, str]]:
+        """
+        Stop-loss / take-profit check for every open position in one vector
+        comparison. 'current_prices' maps symbol → price; open positions
+        without a price are skipped.
+
+        Returns [(symbol, "SL" | "TP"), ...] for the positions whose level was
+        hit (SL wins if both are, as in Position.check_stop_loss first).
+        """
+        n = len(self._open_syms)
+        if not n:
+            return []
+        prices = np.array([current_prices.get(symbol, np.nan) for symbol in self._open_syms])
+        hit_sl = (prices <= self._sl_arr[:n]).tolist()
+        hit_tp = (prices >= self._tp_arr[:n]).tolist()
+        return [
+            (symbol, "SL" if sl else "TP")
+            for symbol, sl, tp in zip(self._open_syms, hit_sl, hit_tp)
+            if sl or tp
+        ]
+
+    def _record_trade(self, *values):
+        """Write one closed trade (values in TRADE_FIELDS order) into the trade columns."""
+        n = self._th_n
+        if n == len(self._th["pnl"]):
+            for name, col in self._th.items():
+                grown = np.empty(2 * n, dtype=col.dtype)
+                grown[:n] = col
+                self._th[name] = grown
+        for (name, _), value in zip(TRADE_FIELDS, values):
+            self._th[name][n] = value
+        self._th_n = n + 1
+
+    def trade_columns(self) -> Dict[str, np.ndarray]:
+        """Closed trades as {field: NumPy view}, one entry per TRADE_FIELDS column."""
+        n = self._th_n
+        return {name: col[:n] for name, col in self._th.items()}
+
+    @property
+    def trade_history(self) -> List[dict]:
+        """
+        Closed trades as a list of dicts (keys: TRADE_FIELDS names), built from
+        the trade columns on each access. Kept for reporting callers; use
+        trade_columns() to avoid per-trade Python objects.
+        """
+        cols = self.trade_columns()
+        lists = [
+            col.astype("datetime64[us]").tolist() if col.dtype.kind == "M" else col.tolist()
+            for col in cols.values()
+        ]
+        return [dict(zip(cols, row)) for row in zip(*lists)]
+
     def get_equity_curve(self) -> pd.DataFrame:
         """
-        Returns a DataFrame of equity over time based on trade_history.
+        Returns a DataFrame of equity over time based on the closed trades.
         Columns: ['timestamp','equity'].
         - First row: daily_starting_capital at the entry_time of the first trade (if any).
         """
-        if not self.trade_history:
+        n = self._th_n
+        if not n:
             return pd.DataFrame(
                 [{"timestamp": datetime.utcnow(), "equity": self.daily_starting_capital}]
             )
 
-        records = []
-        first_entry = self.trade_history[0]["entry_time"]
-        records.append({"timestamp": first_entry, "equity": self.daily_starting_capital})
-
-        for trade in self.trade_history:
-            records.append({
-                "timestamp": trade["exit_time"],
-                "equity":    trade["equity_after"],
-            })
-
-        df_eq = pd.DataFrame(records)
-        df_eq = df_eq.sort_values("timestamp").reset_index(drop=True)
-        return df_eq
+        # Trades are recorded as they close, so the columns are already in
+        # time order: prepend the starting point and build the frame in one call
+        timestamps = np.empty(n + 1, dtype="datetime64[ns]")
+        equity = np.empty(n + 1)
+        timestamps[0] = self._th["entry_time"][0]
+        equity[0] = self.daily_starting_capital
+        timestamps[1:] = self._th["exit_time"][:n]
+        equity[1:] = self._th["equity_after"][:n]
+        return pd.DataFrame({"timestamp": timestamps, "equity": equity})
 
     def get_current_drawdown(self) -> float:
         """
-        Computes the current peak-to-trough drawdown from the equity curve.
-        Returns a decimal (e.g., 0.05 for 5% drawdown).
-        """
-        df_eq = self.get_equity_curve()
-        if df_eq.empty:
-            return 0.0
+        Returns the largest peak-to-trough drawdown of the equity curve so far
+        as a decimal (e.g., 0.05 for 5% drawdown). The running peak and
+        drawdown are maintained by close_position(), so no curve is rebuilt.
 
-        equities = df_eq["equity"].values
-        peaks = pd.Series(equities).cummax().values
-        drawdowns = (peaks - equities) / peaks
-        return float(drawdowns.max())
+        Equivalent to, over get_equity_curve()["equity"]:
+            peaks = np.maximum.accumulate(equity)
+            max((peaks - equity) / peaks)
+        """
+        return self._max_drawdown
 
     def check_daily_targets(self) -> bool:
         """
@@ -297,16 +461,18 @@ class RiskManager:
         current_equity = self.capital
         current_return = (current_equity - self.daily_starting_capital) / self.daily_starting_capital
 
-        if current_return >= (self.config.target_daily_return_pct / 100.0):
+        if current_return >= self._target_return:
             logger.info(
-                f"[RISK] Daily target reached: {current_return*100:.2f}% ≥ {self.config.target_daily_return_pct}%."
+                "[RISK] Daily target reached: %.2f%% ≥ %s%%.",
+                current_return * 100, self.config.target_daily_return_pct
             )
             return False
 
         current_dd = self.get_current_drawdown()
-        if current_dd >= (self.config.daily_max_loss_pct / 100.0):
+        if current_dd >= self._dd_limit:
             logger.info(
-                f"[RISK] Daily drawdown reached: {current_dd*100:.2f}% ≥ {self.config.daily_max_loss_pct}%."
+                "[RISK] Daily drawdown reached: %.2f%% ≥ %s%%.",
+                current_dd * 100, self.config.daily_max_loss_pct
             )
             return False
 
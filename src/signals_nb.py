@@ -0,0 +1,112 @@
+from src.indicators_nb import NUMBA_AVAILABLE, njit
+
+# -----------------------------------------------------------------------------
+# Scalar scoring kernel behind TradingBot.generate_signals(). Compiled with
+# Numba when available (plain Python otherwise, see indicators_nb.njit).
+# No fastmath: NaN inputs during indicator warm-up must compare False.
+# Eager signature: compiled (or loaded from the on-disk cache) at import,
+# so the first bar of a run does not pay the JIT latency; an AOT build from
+# scripts/build_kernels.py replaces it entirely.
+# -----------------------------------------------------------------------------
+BUY_THRESHOLD = 1.5
+SELL_THRESHOLD = 1.5
+
+# Sub-signal weights, in score_signals' order: EMA cross, RSI, Bollinger,
+# VWAP, AI. Tuples, so Numba freezes them into the kernel as constants and
+# the pure-Python fallback keeps returning plain floats.
+BUY_WEIGHTS = (1.0, 0.5, 0.7, 0.5, 1.0)
+SELL_WEIGHTS = (1.0, 0.5, 0.7, 0.5, 1.0)
+
+# Column order score_matrix() expects (DataHandler.latest_matrix(symbols, SCORE_COLUMNS))
+SCORE_COLUMNS = ("close", "ema_short", "ema_long", "rsi", "bb_hband", "bb_lband", "vwap")
+
+if NUMBA_AVAILABLE:
+    from numba import types as nbt
+
+    _SCORE_SIG = nbt.UniTuple(nbt.float64, 2)(*([nbt.float64] * 16))
+else:
+    _SCORE_SIG = None
+
+
+@njit(_SCORE_SIG, cache=True)
+def score_signals(prev_close, price,
+                  prev_ema_s, ema_s, prev_ema_l, ema_l,
+                  rsi,
+                  prev_hband, hband, prev_lband, lband,
+                  prev_vwap, vwap,
+                  predicted_return, rsi_oversold, rsi_overbought):
+    """
+    Weighted buy / sell scores from the last two bars and the AI prediction.
+
+    Sub-signals (BUY_WEIGHTS / SELL_WEIGHTS):
+      - EMA crossover (1.0)
+      - RSI below oversold / above overbought (0.5)
+      - Close breaking the upper / lower Bollinger band (0.7)
+      - Close breaking VWAP (0.5)
+      - Predicted return beyond ±0.5% (1.0)
+
+    Each score is a weighted sum of the sub-signal flags (`&`, not `and`,
+    so there are no branches); terms are added in the order listed.
+
+    Returns:
+        (buy_score, sell_score) as floats.
+    """
+    wb = BUY_WEIGHTS
+    buy_score = (
+        wb[0] * ((prev_ema_s < prev_ema_l) & (ema_s > ema_l))
+        + wb[1] * (rsi < rsi_oversold)
+        + wb[2] * ((prev_close <= prev_hband) & (price > hband))
+        + wb[3] * ((prev_close <= prev_vwap) & (price > vwap))
+        + wb[4] * (predicted_return > 0.005)
+    )
+
+    ws = SELL_WEIGHTS
+    sell_score = (
+        ws[0] * ((prev_ema_s > prev_ema_l) & (ema_s < ema_l))
+        + ws[1] * (rsi > rsi_overbought)
+        + ws[2] * ((prev_close >= prev_lband) & (price < lband))
+        + ws[3] * ((prev_close >= prev_vwap) & (price < vwap))
+        + ws[4] * (predicted_return < -0.005)
+    )
+
+    return buy_score, sell_score
+
+
+# Ahead-of-time build of the kernel (scripts/build_kernels.py) takes precedence
+# when present: no compile or cache load on the first call of a fresh process.
+_score_signals_jit = score_signals
+try:
+    from src.signal_kernels import score_signals
+except ImportError:
+    pass
+
+# Plain-Python body of the kernel (the function itself without Numba);
+# score_matrix() runs it on whole columns
+_score_py = getattr(_score_signals_jit, "py_func", _score_signals_jit)
+
+
+def score_matrix(prev, cur, predicted_return, rsi_oversold, rsi_overbought):
+    """
+    score_signals() for N symbols at once: its undecorated Python body
+    applied to whole columns, where every comparison and weighted sum is a
+    NumPy array expression. One definition, so the two cannot drift apart.
+
+    Args:
+        prev, cur:        (N, len(SCORE_COLUMNS)) arrays of the previous and
+                          latest bar per symbol
+        predicted_return: (N,) array of AI predictions
+
+    Returns:
+        (buy_scores, sell_scores) as (N,) float arrays, equal to
+        score_signals() row by row.
+    """
+    prev_close, prev_ema_s, prev_ema_l, _, prev_hband, prev_lband, prev_vwap = prev.T
+    price, ema_s, ema_l, rsi, hband, lband, vwap = cur.T
+    return _score_py(
+        prev_close, price,
+        prev_ema_s, ema_s, prev_ema_l, ema_l,
+        rsi,
+        prev_hband, hband, prev_lband, lband,
+        prev_vwap, vwap,
+        predicted_return, rsi_oversold, rsi_overbought
+    )
@@ -1,18 +1,23 @@
-import threading
+import asyncio
+import heapq
 import time
 import logging
-from datetime import datetime
+from concurrent.futures import Future
+from datetime import datetime, timedelta
 
 import numpy as np
 import pytz
 
-from typing import Callable, Dict, List
+from typing import Callable, Dict, List, Optional
 
 from src.data_handler import DataHandler
 from src.risk_manager import RiskManager
 from src.config import Config
-from src.broker_api import BrokerAPI
-from src.utils import is_nyse_open, is_nyse_close
+from src.broker_api import BrokerAPI, HOGA_LIMIT
+from src.signals_nb import (
+    BUY_THRESHOLD, SCORE_COLUMNS, SELL_THRESHOLD, score_matrix, score_signals
+)
+from src.utils import nyse_session_bounds
 
 # Placeholder import for AIClient (to be implemented in ai_client.py)
 try:
@@ -34,7 +39,8 @@ class TradingBot:
     전체 자동매매 로직을 수행하는 클래스입니다.
 
     • Live mode: event-driven via Kiwoom.OnReceiveRealData
-    • Backtest mode: dummy tick feed + polling loop
+    • Live-sim mode: dummy tick feed + polling loop
+    • Backtest mode: replays the historical bars, no feed thread or sleeps
 
     New features per revision_config:
       - Accepts an AIClient instance to get real predictions.
@@ -55,6 +61,18 @@ class TradingBot:
         self.ai_client = ai_client
         self.mode = getattr(self.config, "mode", "live")
 
+        # Bars needed before indicators are valid, and the RSI thresholds
+        # (config values are fixed for the run, so read them once here)
+        self._min_bars = max(
+            self.config.ema_long_period,
+            self.config.rsi_period,
+            self.config.bb_period
+        )
+        self._rsi_oversold = self.config.rsi_oversold
+        self._rsi_overbought = self.config.rsi_overbought
+        # Bars per AI feature window (see _ai_features)
+        self._feature_bars = self.config.ema_long_period * 2
+
         # Plugin hooks: lists of callables
         #   before_signal(symbol: str, df: pd.DataFrame) → None
         #   after_signal(symbol: str, signal: dict) → None
@@ -62,11 +80,19 @@ class TradingBot:
             "before_signal": [],
             "after_signal": []
         }
+        # Whether each hook has callbacks (kept by register_plugin), so the
+        # signal path skips plugin dispatch entirely in the common no-plugin case
+        self._has_before = False
+        self._has_after = False
 
         # Live‐mode setup
         self.kiwoom = None
         self.broker = None
 
+        # Symbol → side ("BUY"/"SELL") of an order still queued in BrokerAPI
+        # (no new orders for the symbol until it resolves)
+        self._pending_orders: Dict[str, str] = {}
+
         if self.mode == "live":
             if Kiwoom is None:
                 raise EnvironmentError(
@@ -87,13 +113,30 @@ class TradingBot:
             # Initialize BrokerAPI wrapper
             self.broker = BrokerAPI(
                 kiwoom=self.kiwoom,
-                account_no=self.config.kiwoom_account
+                account_no=self.config.kiwoom_account,
+                orders_per_sec=getattr(self.config, "orders_per_sec", None)
             )
         else:
-            logger.info("[BOT] Running in backtest mode (no Kiwoom).")
+            logger.info("[BOT] Running in %s mode (no Kiwoom).", self.mode)
 
         self.trading_day = None
 
+        # Market-date cache for the tick path (see _market_today): "YYYYMMDD",
+        # a tz-aware base datetime on that date, and the UTC epoch second at
+        # which both roll over (next market midnight)
+        self._today_date_str: Optional[str] = None
+        self._today_base_dt: Optional[datetime] = None
+        self._today_expiry = 0.0
+
+        # Newest bar (epoch ns) each symbol's signals were evaluated on (see _bar_closed)
+        self._last_evaluated_ts: Dict[str, int] = {}
+
+        # Today's market session as UTC epoch seconds (see _market_closed):
+        # 16:00 close, the next market midnight (when to reload) and weekend flag
+        self._close_epoch = 0.0
+        self._session_end = 0.0
+        self._weekend = False
+
     def register_plugin(self, hook_name: str, callback: Callable):
         """
         Register a callback for a plugin hook.
@@ -104,6 +147,8 @@ class TradingBot:
         if hook_name not in self.plugins:
             raise ValueError(f"Unknown hook: {hook_name}")
         self.plugins[hook_name].append(callback)
+        self._has_before = bool(self.plugins["before_signal"])
+        self._has_after = bool(self.plugins["after_signal"])
 
     def initialize(self):
         """
@@ -116,46 +161,123 @@ class TradingBot:
         now_ny = now_utc.astimezone(self.config.time_zone)
         self.trading_day = now_ny.date()
 
-        logger.info(f"[INIT] TradingBot initialized. Trading day (NY): {self.trading_day}")
+        logger.info("[INIT] TradingBot initialized. Trading day (NY): %s", self.trading_day)
 
-    def fetch_realtime_ticks(self):
+    def _market_today(self) -> str:
         """
-        In backtest mode, start a dummy tick feed thread.
-        In live mode, do nothing (Kiwoom callbacks drive ticks).
+        Market-tz date of now as "YYYYMMDD". Recomputed only when the cached
+        date has expired (once per market day), so a tick costs one time.time().
         """
-        if self.mode == "live":
-            return
-
-        def _dummy_tick_feed():
-            while True:
-                now = datetime.utcnow().replace(tzinfo=pytz.utc)
-
-                for symbol in self.config.symbols:
-                    price = np.random.random() * 100
-                    volume = np.random.randint(1, 10)
-                    tick = {"datetime": now, "price": price, "volume": volume}
-
-                    self.data_handler.update_realtime(symbol, tick)
-
-                    # If a new minute bar just closed, generate & execute signal
-                    last_ts = self.data_handler.last_timestamp[symbol]
-                    if last_ts and last_ts == tick["datetime"].astimezone(self.config.time_zone).replace(second=0, microsecond=0):
-                        sig = self.generate_signals(symbol)
-                        if sig["signal"] != "HOLD":
-                            self.execute_order(sig, symbol)
+        now = time.time()
+        if now >= self._today_expiry:
+            tz = self.config.time_zone
+            now_ny = datetime.fromtimestamp(now, tz=pytz.utc).astimezone(tz)
+            midnight = datetime(now_ny.year, now_ny.month, now_ny.day)
+            self._today_date_str = midnight.strftime("%Y%m%d")
+            # Localized at noon: DST switches at 02:00 (on Sundays), so noon's
+            # UTC offset holds for every trading hour; ticks only .replace()
+            # the wall-clock time on it.
+            self._today_base_dt = tz.localize(midnight.replace(hour=12))
+            self._today_expiry = tz.localize(midnight + timedelta(days=1)).timestamp()
+        return self._today_date_str
+
+    def _market_closed(self) -> bool:
+        """
+        is_nyse_close() for now as an epoch-second compare: the session bounds
+        are reloaded from utils.nyse_session_bounds() once per market day, so
+        the poll loops pay one time.time() per iteration.
+        """
+        now_ts = time.time()
+        if now_ts >= self._session_end:
+            now_utc = datetime.fromtimestamp(now_ts, tz=pytz.utc)
+            _, self._close_epoch, self._session_end, self._weekend = nyse_session_bounds(
+                now_utc, self.config.time_zone
+            )
+        return self._weekend or now_ts >= self._close_epoch
 
-                time.sleep(1)
+    def _bar_closed(self, symbol: str) -> bool:
+        """
+        True once per new finalized bar of 'symbol' (and marks it evaluated).
+        Ticks inside an open minute cannot change the signal, so the tick
+        path and poll loops skip generate_signals() until this returns True.
+        """
+        ts = self.data_handler.last_bar_ts(symbol)
+        if ts is None or ts == self._last_evaluated_ts.get(symbol):
+            return False
+        self._last_evaluated_ts[symbol] = ts
+        return True
 
-        thread = threading.Thread(target=_dummy_tick_feed, daemon=True)
-        thread.start()
-        logger.info("[BACKTEST] Dummy tick feed started.")
+    def fetch_realtime_ticks(self) -> Optional[asyncio.Task]:
+        """
+        In live-sim mode, schedule the dummy tick feed as a task on the
+        running event loop (the one _run_live_sim runs on) and return it.
+        The feed only produces ticks; the live-sim loop aggregates them and
+        evaluates signals, both cooperatively on the same thread.
+        In live mode, do nothing (Kiwoom callbacks drive ticks); backtests
+        replay historical bars instead (see _run_backtest).
+        """
+        if self.mode != "live_sim":
+            return None
+
+        task = asyncio.ensure_future(self._dummy_tick_feed())
+        logger.info("[LIVE_SIM] Dummy tick feed started.")
+        return task
+
+    async def _dummy_tick_feed(self):
+        """One synthetic tick per symbol every second, queued with DataHandler.submit_tick()."""
+        symbols = self.config.symbols
+        n = len(symbols)
+        rng = np.random.default_rng()
+        while True:
+            now = datetime.utcnow().replace(tzinfo=pytz.utc)
+
+            # One draw per field for all symbols, then plain Python scalars
+            prices = (rng.random(n) * 100).tolist()
+            volumes = rng.integers(1, 10, n).tolist()
+            for symbol, price, volume in zip(symbols, prices, volumes):
+                tick = {"datetime": now, "price": price, "volume": volume}
+                self.data_handler.submit_tick(symbol, tick)
+
+            await asyncio.sleep(1)
+
+    def _ai_features(self, symbol: str) -> dict:
+        """
+        Feature payload for the AI endpoint: the last N bars as {column: values}.
+        Values are NumPy views straight from the bar store; json_dumps encodes
+        them as JSON lists, so no per-cell Python objects are built here.
+        """
+        return self.data_handler.latest_columns(symbol, self._feature_bars)
 
-    def generate_signals(self, symbol: str) -> dict:
+    def _predict_all(self, symbols: List[str]) -> Dict[str, float]:
+        """
+        Fetch AI predictions for every symbol with enough bars in one
+        concurrent AIClient.predict_many() call. If the batch call itself
+        fails, those symbols get 0.0 (as a failed predict() does) rather
+        than being re-requested one by one.
+        """
+        if self.ai_client is None:
+            return {}
+
+        min_bars = self._min_bars
+        bar_count = self.data_handler.bar_count
+        items = []
+        for symbol in symbols:
+            if bar_count(symbol) >= min_bars:
+                items.append((symbol, self._ai_features(symbol)))
+
+        try:
+            return self.ai_client.predict_many(items)
+        except Exception as e:
+            logger.warning("[AI] Batch prediction failed: %s", e)
+            return {symbol: 0.0 for symbol, _ in items}
+
+    def generate_signals(self, symbol: str, predicted_return: Optional[float] = None) -> dict:
         """
         Generate BUY / SELL / HOLD based on:
-          1) Technical indicators from DataHandler.compute_indicators()
-          2) AI prediction via self.ai_client (when available)
-          3) Weighted‐score logic as before
+          1) Technical indicators of the last two bars (DataHandler.latest_rows())
+          2) AI prediction: 'predicted_return' if the caller already fetched it
+             (see _predict_all), else via self.ai_client (when available)
+          3) Weighted‐score logic (signals_nb.score_signals)
 
         Also invokes plugin hooks:
           - before_signal(symbol, df)
@@ -166,96 +288,93 @@ class TradingBot:
             "price": float,
             "quantity": int }
         """
-        df = self.data_handler.compute_indicators(symbol)
-
-        # Plugin hook: before computing signal
-        for fn in self.plugins["before_signal"]:
-            try:
-                fn(symbol, df)
-            except Exception as e:
-                logger.warning(f"[PLUGIN][before_signal] {symbol} error: {e}")
+        # Plugin hook: before computing signal (plugins get a DataFrame copy,
+        # memoized per bar by DataHandler.compute_indicators)
+        if self._has_before:
+            df = self.data_handler.compute_indicators(symbol)
+            for fn in self.plugins["before_signal"]:
+                try:
+                    fn(symbol, df)
+                except Exception as e:
+                    logger.warning("[PLUGIN][before_signal] %s error: %s", symbol, e)
 
         # Not enough data → HOLD
-        if df.empty or len(df) < max(
-            self.config.ema_long_period,
-            self.config.rsi_period,
-            self.config.bb_period
-        ):
+        data_handler = self.data_handler
+        n_bars = data_handler.bar_count(symbol)
+        if n_bars == 0 or n_bars < self._min_bars:
             result = {"signal": "HOLD"}
-            for fn in self.plugins["after_signal"]:
-                try:
-                    fn(symbol, result)
-                except Exception as e:
-                    logger.warning(f"[PLUGIN][after_signal] {symbol} error: {e}")
+            if self._has_after:
+                for fn in self.plugins["after_signal"]:
+                    try:
+                        fn(symbol, result)
+                    except Exception as e:
+                        logger.warning("[PLUGIN][after_signal] %s error: %s", symbol, e)
             return result
 
-        latest = df.iloc[-1]
-        prev   = df.iloc[-2]
-        price  = latest["close"]
-
-        # 1) EMA crossover
-        ema_cross_up   = (prev["ema_short"] < prev["ema_long"]) and (latest["ema_short"] > latest["ema_long"])
-        ema_cross_down = (prev["ema_short"] > prev["ema_long"]) and (latest["ema_short"] < latest["ema_long"])
+        # Last two bars only, unpacked positionally (SCORE_COLUMNS order) into plain floats
+        prev, cur = data_handler.latest_rows(symbol, SCORE_COLUMNS, k=2)
+        prev_close, prev_ema_s, prev_ema_l, _, prev_hband, prev_lband, prev_vwap = prev
+        price, ema_s, ema_l, rsi, hband, lband, vwap = cur
+
+        # AI prediction (skipped when the caller prefetched it)
+        if predicted_return is None:
+            predicted_return = self._predict_one(symbol)
+
+        # EMA / RSI / Bollinger / VWAP sub-signals + AI → weighted scores
+        # (compiled kernel, see signals_nb)
+        buy_score, sell_score = score_signals(
+            prev_close, price,
+            prev_ema_s, ema_s, prev_ema_l, ema_l,
+            rsi,
+            prev_hband, hband, prev_lband, lband,
+            prev_vwap, vwap,
+            float(predicted_return), self._rsi_oversold, self._rsi_overbought
+        )
 
-        # 2) RSI
-        rsi = latest["rsi"]
-        rsi_oversold   = rsi < self.config.rsi_oversold
-        rsi_overbought = rsi > self.config.rsi_overbought
+        result = self._decide(symbol, price, buy_score, sell_score)
 
-        # 3) Bollinger Band
-        bb_break_up   = (prev["close"] <= prev["bb_hband"]) and (price > latest["bb_hband"])
-        bb_break_down = (prev["close"] >= prev["bb_lband"]) and (price < latest["bb_lband"])
+        # Plugin hook: after computing signal
+        if self._has_after:
+            for fn in self.plugins["after_signal"]:
+                try:
+                    fn(symbol, result)
+                except Exception as e:
+                    logger.warning("[PLUGIN][after_signal] %s error: %s", symbol, e)
 
-        # 4) VWAP
-        vwap_break_up   = (prev["close"] <= prev["vwap"]) and (price > latest["vwap"])
-        vwap_break_down = (prev["close"] >= prev["vwap"]) and (price < latest["vwap"])
+        return result
 
-        # 5) AI prediction
+    def _predict_one(self, symbol: str) -> float:
+        """
+        Prediction for a symbol the caller did not prefetch: AIClient.predict()
+        on the feature window (0.0 on failure), or the random stub without a client.
+        """
         if self.ai_client is not None:
             # Example: pass the last N rows as features
-            features = df.tail(self.config.ema_long_period * 2).to_dict(orient="list")
+            features = self._ai_features(symbol)
             try:
-                predicted_return = self.ai_client.predict(symbol, features)
+                return self.ai_client.predict(symbol, features)
             except Exception as e:
-                logger.warning(f"[AI] Prediction failed for {symbol}: {e}")
-                predicted_return = 0.0
-        else:
-            # Fallback to random stub if AIClient isn’t provided
-            predicted_return = np.random.uniform(-0.01, 0.01)
-
-        ai_buy_signal  = (predicted_return > 0.005)
-        ai_sell_signal = (predicted_return < -0.005)
-
-        # 6) Weighted score
-        buy_score = 0.0
-        if ema_cross_up:   buy_score += 1.0
-        if rsi_oversold:   buy_score += 0.5
-        if bb_break_up:    buy_score += 0.7
-        if vwap_break_up:  buy_score += 0.5
-        if ai_buy_signal:  buy_score += 1.0
-
-        sell_score = 0.0
-        if ema_cross_down: sell_score += 1.0
-        if rsi_overbought: sell_score += 0.5
-        if bb_break_down:  sell_score += 0.7
-        if vwap_break_down: sell_score += 0.5
-        if ai_sell_signal: sell_score += 1.0
-
-        BUY_THRESHOLD  = 1.5
-        SELL_THRESHOLD = 1.5
-
-        has_position = (
-            symbol in self.risk_manager.positions and
-            self.risk_manager.positions[symbol].is_open
-        )
+                logger.warning("[AI] Prediction failed for %s: %s", symbol, e)
+                return 0.0
+        # Fallback to random stub if AIClient isn’t provided
+        return np.random.uniform(-0.01, 0.01)
+
+    def _decide(self, symbol: str, price: float, buy_score: float, sell_score: float) -> dict:
+        """
+        Turn one symbol's scores into a signal dict: BUY (sized by
+        RiskManager.can_open_position) when flat, SELL when holding, with the
+        position's stop-loss / take-profit overriding both.
+        """
+        pos = self.risk_manager.positions.get(symbol)
+        has_position = pos is not None and pos.is_open
 
         # BUY signal
         result = {"signal": "HOLD"}
-        if (buy_score >= BUY_THRESHOLD) and (not has_position) and self.risk_manager.can_open_position(symbol, price):
-            size_info = self.risk_manager.calculate_position_size(symbol, price)
-            if size_info is not None:
-                quantity, _, _ = size_info
-                result = {"signal": "BUY", "price": price, "quantity": quantity}
+        size_info = None
+        if (buy_score >= BUY_THRESHOLD) and (not has_position):
+            size_info = self.risk_manager.can_open_position(symbol, price)
+        if size_info is not None:
+            result = {"signal": "BUY", "price": price, "quantity": size_info[0], "size_info": size_info}
 
         # SELL signal
         elif has_position and (sell_score >= SELL_THRESHOLD):
@@ -263,64 +382,185 @@ class TradingBot:
 
         # Stop-loss / Take-profit override
         if has_position:
-            pos = self.risk_manager.positions[symbol]
             if pos.check_stop_loss(price):
                 result = {"signal": "SELL_SL", "price": price, "quantity": 0}
             elif pos.check_take_profit(price):
                 result = {"signal": "SELL_TP", "price": price, "quantity": 0}
 
-        # Plugin hook: after computing signal
-        for fn in self.plugins["after_signal"]:
-            try:
-                fn(symbol, result)
-            except Exception as e:
-                logger.warning(f"[PLUGIN][after_signal] {symbol} error: {e}")
-
         return result
 
+    def _evaluate(self, symbols: List[str]):
+        """
+        generate_signals() + execute_order() for every symbol in 'symbols',
+        with the scores computed for all of them in one NumPy pass
+        (DataHandler.latest_matrix + signals_nb.score_matrix). Only symbols
+        that can produce a non-HOLD signal (a BUY score over threshold when
+        flat; a SELL score over threshold or a stop-loss / take-profit hit,
+        from RiskManager.check_exits(), when holding) go through the
+        per-symbol _decide() path, popped from
+        a min-heap on -max(buy, sell) so the strongest signals claim cash
+        first (ties keep 'symbols' order). Sizing happens in _decide() right
+        before each order, and execute_order() debits a BUY's cash before
+        returning (in live mode too, where the order is still in BrokerAPI's
+        queue), so the reordering never over-commits cash.
+        Registered plugins need a per-symbol call, so they fall back to
+        generate_signals() in 'symbols' order.
+        """
+        if not symbols:
+            return
+
+        # One concurrent AI round-trip for all symbols
+        predictions = self._predict_all(symbols)
+
+        if self._has_before or self._has_after:
+            for symbol in symbols:
+                sig = self.generate_signals(symbol, predictions.get(symbol))
+                if sig["signal"] != "HOLD":
+                    self.execute_order(sig, symbol)
+            return
+
+        dh = self.data_handler
+        ready = np.array([dh.bar_count(symbol) >= self._min_bars for symbol in symbols])
+
+        predicted = np.zeros(len(symbols))
+        ready_idx = np.flatnonzero(ready)
+        if self.ai_client is None:
+            # Random stub: one draw for all ready symbols, the same values (in
+            # 'symbols' order) as per-symbol _predict_one() calls would give
+            predicted[ready_idx] = np.random.uniform(-0.01, 0.01, ready_idx.size)
+        else:
+            for i in ready_idx.tolist():
+                pred = predictions.get(symbols[i])
+                predicted[i] = self._predict_one(symbols[i]) if pred is None else pred
+
+        prev, cur = dh.latest_matrix(symbols, SCORE_COLUMNS, k=2)
+        buy_scores, sell_scores = score_matrix(
+            prev, cur, predicted, self._rsi_oversold, self._rsi_overbought
+        )
+
+        get_position = self.risk_manager.positions.get
+        has_position = np.array([
+            pos is not None and pos.is_open for pos in map(get_position, symbols)
+        ])
+        prices = cur[:, 0]
+        exits = self.risk_manager.check_exits(dict(zip(symbols, prices.tolist())))
+        exit_hit = np.isin(symbols, [symbol for symbol, _ in exits]) if exits else False
+
+        candidates = ready & np.where(
+            has_position,
+            (sell_scores >= SELL_THRESHOLD) | exit_hit,
+            buy_scores >= BUY_THRESHOLD
+        )
+        urgency = np.maximum(buy_scores, sell_scores)
+        queue = [(-urgency[i], i) for i in np.flatnonzero(candidates).tolist()]
+        heapq.heapify(queue)
+
+        while queue:
+            _, i = heapq.heappop(queue)
+            symbol = symbols[i]
+            sig = self._decide(symbol, float(prices[i]), float(buy_scores[i]), float(sell_scores[i]))
+            if sig["signal"] != "HOLD":
+                self.execute_order(sig, symbol)
+
     def execute_order(self, signal: dict, symbol: str):
         """
         Execute a trade based on the generated signal.
 
         • Live mode: uses BrokerAPI for real orders + RiskManager updates.
+          A BUY reserves its cash (open_position) before the order is
+          queued and is reverted if the order fails; a SELL closes the
+          position once the order was sent. send_order() never sleeps on
+          the rate limit (held-back orders go out on BrokerAPI.pump()), and
+          all of this, Future callbacks included, runs on this thread.
+          There is deliberately no thread pool on top: Kiwoom may only be
+          called from the thread that created it, and RiskManager is only
+          ever touched from here, so it needs no locking.
         • Backtest mode: only RiskManager updates (no external API).
         """
         sig_type = signal.get("signal", "HOLD")
         price    = signal.get("price", 0.0)
         quantity = signal.get("quantity", 0)
+        size_info = signal.get("size_info")  # sizing already done in generate_signals()
+
+        if self.mode == "live" and sig_type != "HOLD" and symbol in self._pending_orders:
+            logger.debug("[ORDER] %s: previous order still pending, skipping %s", symbol, sig_type)
+            return
 
         if sig_type == "BUY":
             if self.mode == "live":
+                # Reserve the cash now, so BUYs decided after this one (same
+                # batch or tick) are sized against what is really left
+                if self.risk_manager.open_position(symbol, price, size_info) is None:
+                    return
                 try:
-                    self.broker.send_order("BUY", symbol, quantity, price, order_type="LIMIT")
-                    self.risk_manager.open_position(symbol, price)
+                    fut = self.broker.send_order("BUY", symbol, quantity, price, order_type=HOGA_LIMIT)
                 except Exception as e:
-                    logger.error(f"[ORDER][BUY] {symbol} failed: {e}")
+                    logger.error("[ORDER][BUY] %s failed: %s", symbol, e)
+                    self.risk_manager.revert_open(symbol)
+                    return
+                self._track_order(
+                    fut, symbol, "BUY",
+                    on_failed=lambda: self.risk_manager.revert_open(symbol)
+                )
             else:
                 try:
-                    self.risk_manager.open_position(symbol, price)
-                    logger.info(f"[BACKTEST][BUY] {symbol} qty={quantity} @ {price:.2f}")
+                    self.risk_manager.open_position(symbol, price, size_info)
+                    logger.info("[BACKTEST][BUY] %s qty=%d @ %.2f", symbol, quantity, price)
                 except Exception as e:
-                    logger.error(f"[BACKTEST][BUY] {symbol} RiskManager failed: {e}")
+                    logger.error("[BACKTEST][BUY] %s RiskManager failed: %s", symbol, e)
 
         elif sig_type in ("SELL", "SELL_SL", "SELL_TP"):
             if self.mode == "live":
                 try:
                     pos = self.risk_manager.positions.get(symbol)
                     qty_to_sell = pos.quantity if pos else 0
-                    self.broker.send_order("SELL", symbol, qty_to_sell, price, order_type="LIMIT")
-                    self.risk_manager.close_position(symbol, price)
+                    fut = self.broker.send_order("SELL", symbol, qty_to_sell, price, order_type=HOGA_LIMIT)
                 except Exception as e:
-                    logger.error(f"[ORDER][SELL] {symbol} failed: {e}")
+                    logger.error("[ORDER][SELL] %s failed: %s", symbol, e)
+                    return
+                # The position (and its cash) is released once the order is
+                # sent; until then it stays open, which never over-commits
+                self._track_order(
+                    fut, symbol, "SELL",
+                    on_sent=lambda: self.risk_manager.close_position(symbol, price)
+                )
             else:
                 try:
                     self.risk_manager.close_position(symbol, price)
-                    logger.info(f"[BACKTEST][SELL] {symbol} @ {price:.2f}")
+                    logger.info("[BACKTEST][SELL] %s @ %.2f", symbol, price)
                 except Exception as e:
-                    logger.error(f"[BACKTEST][SELL] {symbol} RiskManager failed: {e}")
+                    logger.error("[BACKTEST][SELL] %s RiskManager failed: %s", symbol, e)
 
         # HOLD → do nothing
 
+    def _track_order(
+        self, fut: Future, symbol: str, side: str,
+        on_sent: Optional[Callable[[], None]] = None,
+        on_failed: Optional[Callable[[], None]] = None
+    ):
+        """
+        Mark 'symbol' as having an order in flight until BrokerAPI resolves
+        'fut', then run 'on_sent' or, if the order failed or was cancelled,
+        'on_failed' (the RiskManager update / rollback). BrokerAPI resolves
+        its Futures on the thread that owns Kiwoom, i.e. this one, so the
+        callbacks never race the signal path.
+        """
+        self._pending_orders[symbol] = side
+
+        def _done(f: Future):
+            try:
+                exc = "cancelled" if f.cancelled() else f.exception()
+                if exc is not None:
+                    logger.error("[ORDER][%s] %s failed: %s", side, symbol, exc)
+                    if on_failed is not None:
+                        on_failed()
+                elif on_sent is not None:
+                    on_sent()
+            finally:
+                self._pending_orders.pop(symbol, None)
+
+        fut.add_done_callback(_done)
+
     def run(self):
         """
         Main loop:
@@ -330,49 +570,132 @@ class TradingBot:
             - Sleep until market close (16:00 NY), then final cleanup.
             - All trading is driven by _on_receive_real_data.
 
-        • Backtest mode:
+        • Live-sim mode:
             - Call initialize()
-            - Start dummy tick feed
-            - Poll every loop_interval_sec: generate signals on latest bar & execute
+            - On one asyncio event loop (_run_live_sim): start the dummy
+              tick feed task and poll every loop_interval_sec: generate signals for symbols with a
+              newly closed bar & execute
             - Check daily targets; exit if hit or if market close.
             - Final cleanup.
+
+        • Backtest mode:
+            - Call initialize()
+            - Replay the historical bars as fast as they can be evaluated
+              (_run_backtest); exit early if a daily target is hit.
+            - Final cleanup.
         """
         self.initialize()
 
         if self.mode == "live":
             logger.info("[BOT] Live mode: awaiting real-time ticks...")
             while True:
-                now_utc = datetime.utcnow().replace(tzinfo=pytz.utc)
-                if is_nyse_close(now_utc, self.config.time_zone):
+                if self._market_closed():
                     logger.info("[MARKET] Market closed. Starting final cleanup.")
                     break
-                time.sleep(30)
+                # Send orders held back by the rate limit, waking when the next may go
+                delay = self.broker.pump()
+                time.sleep(30.0 if delay is None else min(delay, 30.0))
+            self._final_cleanup()
+
+        elif self.mode == "backtest":
+            logger.info("[BOT] Backtest mode: replaying historical bars.")
+            self._run_backtest()
             self._final_cleanup()
 
         else:
-            logger.info("[BOT] Backtest mode: starting dummy tick feed.")
-            self.fetch_realtime_ticks()
+            logger.info("[BOT] Live-sim mode: starting dummy tick feed.")
+            asyncio.run(self._run_live_sim())
+            self._final_cleanup()
+
+    async def _run_live_sim(self):
+        """
+        Live-sim loop: the dummy feed and this poll loop are tasks on one
+        event loop, so no feed thread is needed; signal evaluation, which
+        blocks on the AI endpoint, runs in a worker thread (asyncio.to_thread)
+        so it does not stall the feed. Returns (cancelling the feed) at market
+        close or when a daily target is hit.
+
+        Iterations start on a fixed loop_interval_sec grid (monotonic
+        deadlines), so the period does not stretch by each pass's work time.
+        A pass that overruns its slot starts the next one immediately and
+        re-anchors the grid instead of bursting to catch up.
+        """
+        feed = self.fetch_realtime_ticks()
+        dh = self.data_handler
+        symbols = self.config.symbols
+        interval = self.config.loop_interval_sec
+        next_tick = time.monotonic()
+        try:
             while True:
-                now_utc = datetime.utcnow().replace(tzinfo=pytz.utc)
-                if is_nyse_close(now_utc, self.config.time_zone):
-                    logger.info("[BACKTEST] Market closed. Starting final cleanup.")
+                if self._market_closed():
+                    logger.info("[LIVE_SIM] Market closed. Starting final cleanup.")
                     break
 
-                for symbol in self.config.symbols:
-                    df = self.data_handler.historical_data[symbol]
-                    if df.empty:
-                        continue
-                    sig = self.generate_signals(symbol)
-                    if sig["signal"] != "HOLD":
-                        self.execute_order(sig, symbol)
+                # Fold ticks queued by the feed task into minute bars
+                for symbol in symbols:
+                    dh.drain_ticks(symbol)
+
+                # Only symbols whose bar rolled since the last evaluation. Run
+                # off the loop: the AI round trip blocks, and the feed task must
+                # keep ticking meanwhile. Bars only change in drain_ticks()
+                # above, so the worker sees a stable bar store.
+                closed = [symbol for symbol in symbols if self._bar_closed(symbol)]
+                if closed:
+                    await asyncio.to_thread(self._evaluate, closed)
 
                 if not self.risk_manager.check_daily_targets():
-                    logger.info("[BACKTEST] Daily target/loss reached. Exiting loop.")
+                    logger.info("[LIVE_SIM] Daily target/loss reached. Exiting loop.")
                     break
 
-                time.sleep(self.config.loop_interval_sec)
+                next_tick += interval
+                delay = next_tick - time.monotonic()
+                if delay < 0:
+                    logger.warning("[LIVE_SIM] Loop pass overran its interval by %.3fs.", -delay)
+                    next_tick -= delay
+                    delay = 0.0
+                await asyncio.sleep(delay)
+        finally:
+            feed.cancel()
+
+    def _run_backtest(self):
+        """
+        Walk the loaded history minute by minute across all symbols. At each
+        timestamp every symbol with a bar there is evaluated as if that bar had
+        just closed: DataHandler's replay cursor limits latest()/bar_count() to
+        the bars up to it, so signals read the same zero-copy views as live.
+        """
+        dh = self.data_handler
+        stamps = {s: dh.bar_timestamps(s) for s in self.config.symbols}
+        stamps = {s: ts for s, ts in stamps.items() if len(ts)}
+        if not stamps:
+            logger.warning("[BACKTEST] No historical bars to replay.")
+            return
+
+        # Union of all bar times; ends[s][i] = bars of 's' stamped at or before clock[i]
+        clock = np.unique(np.concatenate(list(stamps.values())))
+        ends = {s: np.searchsorted(ts, clock, side="right").tolist() for s, ts in stamps.items()}
 
-            self._final_cleanup()
+        prev = dict.fromkeys(stamps, 0)
+        try:
+            for i in range(len(clock)):
+                active = []
+                for symbol, end in ends.items():
+                    n = end[i]
+                    if n != prev[symbol]:  # symbol has a bar at this minute
+                        prev[symbol] = n
+                        dh.set_replay_end(symbol, n)
+                        active.append(symbol)
+
+                self._evaluate(active)
+
+                if not self.risk_manager.check_daily_targets():
+                    logger.info("[BACKTEST] Daily target/loss reached. Exiting loop.")
+                    break
+        finally:
+            for symbol in stamps:
+                dh.set_replay_end(symbol, None)
+
+        logger.info("[BACKTEST] Replayed %d bar times for %d symbols.", i + 1, len(stamps))
 
     def _on_receive_real_data(self, sRealType, sRealData):
         """
@@ -380,25 +703,28 @@ class TradingBot:
         sRealType: the real‐time type code (e.g., “주식체결” for tick)
         sRealData: dict or raw data containing fields like 체결시간, 현재가, 거래량, 종목코드.
         """
+        # Orders queued behind the rate limit go out from this (Kiwoom's) thread
+        self.broker.pump()
+
         if sRealType != "주식체결":
             return
 
         # Extract symbol, time, price, volume
         symbol = sRealData["종목코드"]
-        date_str = datetime.now(pytz.utc).astimezone(self.config.time_zone).strftime("%Y%m%d")
         time_str = sRealData["체결시간"]  # e.g., "093012"
-        # parse into NY‐tz datetime
-        dt_naive = datetime.strptime(date_str + time_str, "%Y%m%d%H%M%S")
-        dt_ny = self.config.time_zone.localize(dt_naive)
+        # HHMMSS on today's market date → NY‐tz datetime (no strptime/localize per tick)
+        self._market_today()
+        dt_ny = self._today_base_dt.replace(
+            hour=int(time_str[0:2]), minute=int(time_str[2:4]), second=int(time_str[4:6])
+        )
         price = float(sRealData["현재가"])
         volume = int(sRealData["거래량"])
 
         tick = {"datetime": dt_ny, "price": price, "volume": volume}
         self.data_handler.update_realtime(symbol, tick)
 
-        # If that tick closed a new 1-min bar, generate & execute
-        last_ts = self.data_handler.last_timestamp[symbol]
-        if last_ts and last_ts == tick["datetime"].replace(second=0, microsecond=0):
+        # If that tick closed a new 1-min bar, generate & execute (once per bar)
+        if self._bar_closed(symbol):
             sig = self.generate_signals(symbol)
             if sig["signal"] != "HOLD":
                 self.execute_order(sig, symbol)
@@ -410,14 +736,30 @@ class TradingBot:
         logger.info("[CLEANUP] Liquidating all open positions...")
         for symbol, pos in list(self.risk_manager.positions.items()):
             if pos.is_open:
-                df = self.data_handler.historical_data[symbol]
-                last_price = df["close"].iloc[-1] if not df.empty else 0.0
+                last_price = self.data_handler.last_close(symbol)
+                if last_price != last_price:  # NaN → no bars
+                    last_price = 0.0
+                if self.mode == "live":
+                    if self._pending_orders.get(symbol) == "SELL":
+                        continue  # exit already queued
+                    # Closed (and logged) by the callback once the order is sent
+                    try:
+                        fut = self.broker.send_order("SELL", symbol, pos.quantity, last_price, order_type=HOGA_LIMIT)
+                    except Exception as e:
+                        logger.error("[CLEANUP] Failed to close %s: %s", symbol, e)
+                        continue
+                    self._track_order(
+                        fut, symbol, "SELL",
+                        on_sent=lambda s=symbol, p=last_price: self.risk_manager.close_position(s, p)
+                    )
+                    continue
                 try:
-                    if self.mode == "live":
-                        qty_to_sell = pos.quantity
-                        self.broker.send_order("SELL", symbol, qty_to_sell, last_price, order_type="LIMIT")
                     self.risk_manager.close_position(symbol, last_price)
-                    logger.info(f"[CLEANUP] {symbol} closed @ {last_price:.2f}")
+                    logger.info("[CLEANUP] %s closed @ %.2f", symbol, last_price)
                 except Exception as e:
-                    logger.error(f"[CLEANUP] Failed to close {symbol}: {e}")
+                    logger.error("[CLEANUP] Failed to close %s: %s", symbol, e)
+
+        if self.broker is not None:
+            # Sends whatever the rate limit still holds back (blocking, paced)
+            self.broker.close(timeout=5.0)
         logger.info("[CLEANUP] All positions liquidated.")
\ No newline at end of file
@@ -1,9 +1,11 @@
 import json
 import logging
 from datetime import datetime, timedelta
+from typing import Tuple
+
 import pytz
 
-from src.config import Config, setup_logging
+from src.config import Config, json_loads, setup_logging
 
 logger = logging.getLogger(__name__)
 
@@ -17,7 +19,7 @@ def load_config(path: str) -> Config:
     """
     config = Config.from_json(path)
     setup_logging(config.log_level, config.log_file)
-    logger.info(f"[UTILS] Loaded configuration from {path}")
+    logger.info("[UTILS] Loaded configuration from %s", path)
     return config
 
 
@@ -57,20 +59,55 @@ def parse_kiwoom_timestamp(date_str: str, time_str: str, tz: pytz.BaseTzInfo) ->
     return tz.localize(dt_naive)
 
 
+# Bounds of the market day last asked about, as UTC epoch seconds:
+# (tz, day_start, day_end, open, close, is_weekend). Rebuilt once per market
+# day, so is_nyse_open/is_nyse_close are plain float compares in between.
+_session_cache = None
+
+
+def _nyse_session(now_utc: datetime, tz: pytz.BaseTzInfo):
+    """Return (session bounds for now_utc's market day, now_utc as epoch seconds)."""
+    global _session_cache
+    if now_utc.tzinfo is None:
+        now_utc = pytz.utc.localize(now_utc)
+    ts = now_utc.timestamp()
+
+    cached = _session_cache
+    if cached is not None and cached[0] is tz and cached[1] <= ts < cached[2]:
+        return cached, ts
+
+    now_ny = now_utc.astimezone(tz)
+    day = datetime(now_ny.year, now_ny.month, now_ny.day)
+    cached = (
+        tz,
+        tz.localize(day).timestamp(),
+        tz.localize(day + timedelta(days=1)).timestamp(),
+        tz.localize(day.replace(hour=9, minute=30)).timestamp(),
+        tz.localize(day.replace(hour=16)).timestamp(),
+        now_ny.weekday() >= 5,  # 5 = Saturday, 6 = Sunday
+    )
+    _session_cache = cached
+    return cached, ts
+
+
+def nyse_session_bounds(now_utc: datetime, tz: pytz.BaseTzInfo) -> Tuple[float, float, float, bool]:
+    """
+    Return (open, close, day_end, is_weekend) for now_utc's market day, the
+    times as UTC epoch seconds (09:30, 16:00 and the next midnight in tz).
+    Callers can cache them until day_end and compare time.time() directly.
+    """
+    (_, _, day_end, open_ts, close_ts, weekend), _ = _nyse_session(now_utc, tz)
+    return open_ts, close_ts, day_end, weekend
+
+
 def is_nyse_open(now_utc: datetime, tz: pytz.BaseTzInfo) -> bool:
     """
     Given a UTC datetime (naive or tz-aware), return True if NYSE is open.
 
     Hours: 09:30 – 16:00 America/New_York, Monday through Friday.
     """
-    now_ny = utc_to_tz(now_utc, tz)
-    # Weekend check: 5 = Saturday, 6 = Sunday
-    if now_ny.weekday() >= 5:
-        return False
-
-    open_time = now_ny.replace(hour=9, minute=30, second=0, microsecond=0)
-    close_time = now_ny.replace(hour=16, minute=0, second=0, microsecond=0)
-    return open_time <= now_ny < close_time
+    (_, _, _, open_ts, close_ts, weekend), ts = _nyse_session(now_utc, tz)
+    return not weekend and open_ts <= ts < close_ts
 
 
 def is_nyse_close(now_utc: datetime, tz: pytz.BaseTzInfo) -> bool:
@@ -79,15 +116,8 @@ def is_nyse_close(now_utc: datetime, tz: pytz.BaseTzInfo) -> bool:
 
     Note: If it is Saturday or Sunday in NY, this returns True immediately.
     """
-    now_ny = utc_to_tz(now_utc, tz)
-    if now_ny.weekday() >= 5:
-        return True
-
-    # After 16:00 on a weekday
-    if now_ny.hour > 16 or (now_ny.hour == 16 and now_ny.minute >= 0):
-        return True
-
-    return False
+    (_, _, _, _, close_ts, weekend), ts = _nyse_session(now_utc, tz)
+    return weekend or ts >= close_ts
 
 
 def prune_dataframe_by_days(df, days: int, tz: pytz.BaseTzInfo) -> None:
@@ -95,14 +125,21 @@ def prune_dataframe_by_days(df, days: int, tz: pytz.BaseTzInfo) -> None:
     In-place prune: keep only rows from the last `days` days in the DataFrame `df`.
 
     Assumes df is indexed by a tz-aware datetime in the same timezone `tz`.
-    Any rows with timestamp < (now_tz - days) are dropped.
+    Any rows with timestamp < (now_tz - days) are dropped. On a sorted index
+    (the usual case) the cutoff is found by binary search and the rows go
+    as one leading slice; otherwise a boolean mask is used.
     """
     if df.empty:
         return
 
     now_tz = datetime.utcnow().replace(tzinfo=pytz.utc).astimezone(tz)
     cutoff = now_tz - timedelta(days=days)
-    df.drop(df[df.index < cutoff].index, inplace=True)
+    if df.index.is_monotonic_increasing:
+        i = df.index.searchsorted(cutoff, side="left")
+        if i > 0:
+            df.drop(df.index[:i], inplace=True)
+    else:
+        df.drop(df.index[df.index < cutoff], inplace=True)
 
 
 def load_json_safely(path: str) -> dict:
@@ -111,13 +148,13 @@ def load_json_safely(path: str) -> dict:
     Raises a clear error if the file does not exist or is invalid JSON.
     """
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        with open(path, "rb") as f:
+            return json_loads(f.read())
     except FileNotFoundError:
-        logger.error(f"[UTILS] JSON file not found: {path}")
+        logger.error("[UTILS] JSON file not found: %s", path)
         raise
     except json.JSONDecodeError as e:
-        logger.error(f"[UTILS] Invalid JSON in {path}: {e}")
+        logger.error("[UTILS] Invalid JSON in %s: %s", path, e)
         raise
 
 
@@ -0,0 +1,128 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+from src.ai_client import AIClient
+
+
+class StubServer:
+    """
+    Local HTTP endpoint. Each request pops the next (status, body) from
+    'script' (the last entry repeats), so the client's real urllib3 retry
+    path is exercised instead of a mocked session.
+    """
+
+    def __init__(self):
+        self.script = [(200, {"predicted_return": 0.01})]
+        self.requests = []   # decoded JSON bodies, in arrival order
+        self.clients = set()  # client (host, port) pairs seen
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                with stub._lock:
+                    stub.requests.append(json.loads(body))
+                    stub.clients.add(self.client_address)
+                    status, payload = stub.script.pop(0) if len(stub.script) > 1 else stub.script[0]
+                if callable(payload):
+                    payload = payload(stub.requests[-1])
+                data = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.send_header("Retry-After", "0")
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = "http://127.0.0.1:%d/predict" % self._httpd.server_address[1]
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self._thread.start()
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    stub = StubServer()
+    yield stub
+    stub.close()
+
+
+def make_client(endpoint: str, **overrides) -> AIClient:
+    values = dict(ai_endpoint=endpoint, ai_api_key="test-key", ai_max_retries=3,
+                  ai_request_timeout=2.0)
+    values.update(overrides)
+    return AIClient(SimpleNamespace(**values))
+
+
+def test_predict_returns_predicted_return(server):
+    client = make_client(server.url)
+    assert client.predict("AAPL", {"close": [1.0, 2.0]}) == pytest.approx(0.01)
+    assert server.requests == [{"symbol": "AAPL", "features": {"close": [1.0, 2.0]}}]
+
+
+def test_retries_5xx_then_succeeds(server):
+    server.script = [(503, {}), (502, {}), (200, {"predicted_return": -0.02})]
+    client = make_client(server.url)
+    assert client.predict("AAPL", {}) == pytest.approx(-0.02)
+    assert len(server.requests) == 3
+
+
+def test_gives_up_after_max_attempts(server):
+    server.script = [(503, {})]
+    client = make_client(server.url, ai_max_retries=2)
+    assert client.predict("AAPL", {}) == 0.0
+    assert len(server.requests) == 2
+
+
+def test_client_errors_are_not_retried(server):
+    server.script = [(400, {"error": "bad features"})]
+    client = make_client(server.url)
+    assert client.predict("AAPL", {}) == 0.0
+    assert len(server.requests) == 1
+
+
+def test_invalid_body_falls_back_to_zero(server):
+    server.script = [(200, b"not json")]
+    client = make_client(server.url)
+    assert client.predict("AAPL", {}) == 0.0
+
+
+def test_unreachable_endpoint_falls_back_to_zero(server):
+    url = server.url
+    server.close()
+    client = make_client(url, ai_max_retries=1)
+    assert client.predict("AAPL", {}) == 0.0
+
+
+def test_session_reuses_connection(server):
+    client = make_client(server.url)
+    for _ in range(5):
+        client.predict("AAPL", {})
+    assert len(server.requests) == 5
+    assert len(server.clients) == 1
+
+
+def test_predict_many_maps_each_symbol(server):
+    server.script = [(200, lambda req: {"predicted_return": len(req["symbol"]) / 100})]
+    client = make_client(server.url)
+    symbols = ["A", "BB", "CCC", "DDDD"]
+    result = client.predict_many([(s, {"close": [1.0]}) for s in symbols])
+    assert result == {s: pytest.approx(len(s) / 100) for s in symbols}
+    assert sorted(r["symbol"] for r in server.requests) == symbols
+    assert client.predict_many([]) == {}
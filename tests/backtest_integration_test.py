@@ -0,0 +1,141 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+import pytz
+
+from src.data_handler import DataHandler
+from src.risk_manager import RiskManager
+from src.trading_bot import TradingBot
+
+SYMBOLS = ("AAPL", "MSFT", "NVDA")
+
+
+def make_config(**overrides):
+    values = dict(
+        mode="backtest", symbols=SYMBOLS,
+        time_zone=pytz.timezone("US/Eastern"), local_tz=pytz.timezone("Asia/Seoul"),
+        ema_short_period=12, ema_long_period=26, rsi_period=14,
+        rsi_oversold=45, rsi_overbought=55, bb_period=20, bb_std_dev=2.0, atr_period=14,
+        ema_alpha_short=None, ema_alpha_long=None, rsi_alpha=None,
+        historical_lookback_days=36500,
+        initial_capital=100_000.0, max_position_pct=0.01,
+        stop_loss_pct=0.5, take_profit_pct=1.0,
+        daily_max_loss_pct=50.0, target_daily_return_pct=50.0,
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def write_sample_csvs(root) -> dict:
+    """
+    data/historical/{symbol}_1min.csv for every symbol, as
+    scripts/generate_smaple.py lays them out. Start times and lengths differ,
+    so the replay clock is a real union of bar times.
+    """
+    folder = root / "data" / "historical"
+    folder.mkdir(parents=True)
+    frames = {}
+    for j, symbol in enumerate(SYMBOLS):
+        rng = np.random.default_rng(j)
+        n = 240 + 30 * j
+        index = pd.date_range("2025-06-02 09:30", periods=n, freq="1min") + pd.Timedelta(minutes=7 * j)
+        open_ = 100 + np.cumsum(rng.standard_normal(n)) * 0.3
+        close = open_ + rng.standard_normal(n) * 0.2
+        df = pd.DataFrame({
+            "datetime": index,
+            "open": open_.round(2),
+            "high": (np.maximum(open_, close) + np.abs(rng.standard_normal(n)) * 0.2).round(2),
+            "low": (np.minimum(open_, close) - np.abs(rng.standard_normal(n)) * 0.2).round(2),
+            "close": close.round(2),
+            "volume": rng.integers(100, 1000, n),
+        })
+        df.to_csv(folder / f"{symbol}_1min.csv", index=False)
+        frames[symbol] = df
+    return frames
+
+
+class MomentumAI:
+    """
+    Stand-in for AIClient: predicts the sign of the last close-to-close move.
+    Also checks the replay order: each call must show a symbol's bars up to
+    exactly one bar past its previous call (the first call at the warm-up
+    length), never bars from further ahead.
+    """
+
+    def __init__(self, frames: dict, min_bars: int):
+        self.closes = {s: df["close"].to_numpy() for s, df in frames.items()}
+        self.seen = {s: min_bars - 1 for s in frames}
+        self.calls = 0
+        self.out_of_order = []
+
+    def predict_many(self, items):
+        self.calls += 1
+        out = {}
+        for symbol, features in items:
+            close = np.asarray(features["close"])
+            n = self.seen[symbol] + 1
+            if not np.array_equal(close, self.closes[symbol][max(n - len(close), 0):n]):
+                self.out_of_order.append((symbol, n))
+            self.seen[symbol] = n
+            out[symbol] = 0.01 if close[-1] > close[-2] else -0.01
+        return out
+
+
+def run_backtest(root):
+    frames = write_sample_csvs(root)
+    config = make_config()
+    dh = DataHandler(config, mode="backtest")
+    rm = RiskManager(config)
+    ai = MomentumAI(frames, min_bars=config.ema_long_period)
+    bot = TradingBot(config, dh, rm, ai_client=ai)
+    bot.run()
+    return frames, dh, rm, ai
+
+
+@pytest.fixture
+def backtest(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return run_backtest(tmp_path)
+
+
+def test_backtest_trades_and_balances(backtest):
+    frames, dh, rm, ai = backtest
+    trades = rm.trade_columns()
+
+    assert ai.calls > 0
+    assert len(trades["pnl"]) > 0
+    # Everything was liquidated at the end and the books balance
+    assert not any(pos.is_open for pos in rm.positions.values())
+    assert rm.capital == pytest.approx(100_000.0 + trades["pnl"].sum())
+    assert rm.available_cash == pytest.approx(rm.capital)
+    assert trades["equity_after"][-1] == pytest.approx(rm.capital)
+
+    # Entries and exits happen at a replayed close of that symbol
+    for symbol, entry, exit_ in zip(trades["symbol"], trades["entry_price"], trades["exit_price"]):
+        closes = frames[symbol]["close"].to_numpy()
+        assert np.isclose(closes, entry).any()
+        assert np.isclose(closes, exit_).any()
+
+
+def test_backtest_has_no_lookahead(backtest):
+    frames, dh, _, ai = backtest
+    assert ai.out_of_order == []
+    # Every bar of every symbol was replayed
+    assert ai.seen == {s: len(df) for s, df in frames.items()}
+    # The replay cursor is released afterwards: every stored bar is visible again
+    for symbol in SYMBOLS:
+        assert dh.bar_count(symbol) == len(dh.bar_timestamps(symbol))
+
+
+def test_backtest_is_deterministic(tmp_path, monkeypatch):
+    results = []
+    for run in ("a", "b"):
+        root = tmp_path / run
+        root.mkdir()
+        monkeypatch.chdir(root)
+        _, _, rm, _ = run_backtest(root)
+        cols = rm.trade_columns()
+        results.append((cols["symbol"].tolist(), cols["pnl"].tolist()))
+    assert results[0] == results[1]
@@ -0,0 +1,73 @@
+import time
+
+import numpy as np
+import pytest
+
+from src.broker_api import BrokerAPI, TokenBucket
+
+
+def test_invalid_parameters():
+    with pytest.raises(ValueError):
+        TokenBucket(0, 1)
+    with pytest.raises(ValueError):
+        TokenBucket(5, 0.5)
+
+
+def test_burst_passes_immediately():
+    bucket = TokenBucket(rate=5.0, capacity=5)
+    t0 = time.monotonic()
+    for _ in range(5):
+        bucket.acquire()
+    assert time.monotonic() - t0 < 0.05
+
+
+def test_acquire_paces_to_rate():
+    bucket = TokenBucket(rate=20.0, capacity=1)
+    t0 = time.monotonic()
+    for _ in range(5):
+        bucket.acquire()
+    # First token is free; the other four wait 1/20 s each
+    elapsed = time.monotonic() - t0
+    assert 0.18 <= elapsed < 0.5
+
+
+def test_try_acquire_and_wait_time():
+    bucket = TokenBucket(rate=10.0, capacity=2)
+    assert bucket.wait_time() == 0.0
+    assert bucket.try_acquire()
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+    wait = bucket.wait_time()
+    assert 0.0 < wait <= 0.1
+    time.sleep(wait + 0.01)
+    assert bucket.try_acquire()
+
+
+class FakeKiwoom:
+    """Records the monotonic time of every SendOrder call."""
+
+    def __init__(self):
+        self.sent = []
+
+    def SendOrder(self, *args):
+        self.sent.append(time.monotonic())
+        return 0
+
+
+def test_broker_never_exceeds_rate_in_any_one_second_window():
+    kiwoom = FakeKiwoom()
+    broker = BrokerAPI(kiwoom, "0000", orders_per_sec=5)
+    futures = [broker.send_order("BUY", "005930", 1, 100.0) for _ in range(12)]
+    while True:
+        delay = broker.pump()
+        if delay is None:
+            break
+        time.sleep(delay)
+    assert all(f.done() for f in futures)
+    assert len(kiwoom.sent) == 12
+
+    sent = np.array(kiwoom.sent)
+    # Orders in [t, t + 1s) for every order time t; allow a little clock slack
+    in_window = np.searchsorted(sent, sent + 1.0 - 0.01, side="left") - np.arange(sent.size)
+    assert in_window.max() <= 5
+    assert np.diff(sent).min() >= 0.2 - 0.01
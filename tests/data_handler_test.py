@@ -0,0 +1,357 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+import pytz
+
+from src.data_handler import (
+    BAR_COLUMNS, NS_PER_DAY, BarBuffer, DataHandler, TickBuffer, TickRing
+)
+from src.indicators_nb import OUTPUT_COLUMNS, compute_all
+
+NS_PER_MIN = 60_000_000_000
+
+
+def row(i: float) -> np.ndarray:
+    return np.full(len(BAR_COLUMNS), float(i))
+
+
+def fill(buf: BarBuffer, start: int, stop: int):
+    for i in range(start, stop):
+        buf.append(i * NS_PER_MIN, row(i))
+
+
+def test_append_and_views():
+    buf = BarBuffer()
+    fill(buf, 0, 10)
+    assert len(buf) == 10
+    np.testing.assert_array_equal(buf.column("close"), np.arange(10.0))
+    np.testing.assert_array_equal(buf.timestamps(), np.arange(10) * NS_PER_MIN)
+    assert buf.last_ts_ns == 9 * NS_PER_MIN
+    assert buf.last_close == 9.0
+    assert buf.block(slice(-2, None)).shape == (len(BAR_COLUMNS), 2)
+
+
+def test_version_bumps_on_every_mutation():
+    buf = BarBuffer()
+    v0 = buf.version
+    fill(buf, 0, 3)
+    assert buf.version == v0 + 3
+    buf.prune_before(1 * NS_PER_MIN)
+    assert buf.version == v0 + 4
+
+
+def test_prune_before_drops_older_bars():
+    buf = BarBuffer()
+    fill(buf, 0, 10)
+    buf.prune_before(4 * NS_PER_MIN)
+    assert len(buf) == 6
+    np.testing.assert_array_equal(buf.column("close"), np.arange(4.0, 10.0))
+    # A cutoff before the oldest bar keeps everything
+    buf.prune_before(0)
+    assert len(buf) == 6
+
+
+def test_growth_keeps_earlier_views_intact():
+    buf = BarBuffer()
+    fill(buf, 0, BarBuffer.MIN_CAPACITY)
+    view = buf.column("close")
+    fill(buf, BarBuffer.MIN_CAPACITY, BarBuffer.MIN_CAPACITY + 10)
+    assert len(buf) == BarBuffer.MIN_CAPACITY + 10
+    np.testing.assert_array_equal(view, np.arange(float(BarBuffer.MIN_CAPACITY)))
+    np.testing.assert_array_equal(
+        buf.column("close"), np.arange(float(BarBuffer.MIN_CAPACITY + 10))
+    )
+
+
+def test_prune_compacts_a_mostly_empty_block():
+    n = 4000
+    index = pd.date_range("2025-06-02 09:30", periods=n, freq="1min", tz="UTC")
+    buf = BarBuffer()
+    buf.load(pd.DataFrame({"close": np.arange(float(n))}, index=index))
+    assert buf._ts.shape[0] == 2 * n
+
+    buf.prune_before(index[n - 100].value)
+    assert len(buf) == 100
+    assert buf._ts.shape[0] == BarBuffer.MIN_CAPACITY
+    assert buf._start == 0
+    np.testing.assert_array_equal(buf.column("close"), np.arange(n - 100.0, n))
+    # Columns the frame did not carry load as NaN
+    assert np.isnan(buf.column("volume")).all()
+
+
+def test_frame_is_tz_aware_view():
+    buf = BarBuffer()
+    fill(buf, 0, 5)
+    df = buf.frame("US/Eastern")
+    assert list(df.columns) == BAR_COLUMNS
+    assert str(df.index.tz) == "US/Eastern"
+    assert df.index[0] == pd.Timestamp(0, tz="UTC")
+    assert df["close"].tolist() == pytest.approx([0.0, 1.0, 2.0, 3.0, 4.0])
+
+
+# -----------------------------------------------------------------------------
+# DataHandler tick path
+# -----------------------------------------------------------------------------
+TZ = pytz.timezone("US/Eastern")
+
+
+def make_config(symbols=("AAPL",)):
+    return SimpleNamespace(
+        symbols=tuple(symbols), time_zone=TZ, local_tz=pytz.timezone("Asia/Seoul"),
+        ema_short_period=12, ema_long_period=26, rsi_period=14,
+        bb_period=20, bb_std_dev=2.0, atr_period=14,
+        ema_alpha_short=None, ema_alpha_long=None, rsi_alpha=None,
+        historical_lookback_days=3650,
+    )
+
+
+def make_bars(start: str, n: int, seed: int = 0) -> pd.DataFrame:
+    """Random-walk 1-minute OHLCV bars in market time, integer volumes."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(start, periods=n, freq="1min", tz=TZ)
+    open_ = 100 + np.cumsum(rng.standard_normal(n)) * 0.5
+    close = open_ + rng.standard_normal(n) * 0.1
+    return pd.DataFrame({
+        "open": open_,
+        "high": np.maximum(open_, close) + np.abs(rng.standard_normal(n)),
+        "low": np.minimum(open_, close) - np.abs(rng.standard_normal(n)),
+        "close": close,
+        "volume": rng.integers(10, 1000, n).astype(float),
+    }, index=index)
+
+
+def bar_ticks(ts: pd.Timestamp, bar) -> list:
+    """Four ticks inside one minute that reproduce the bar's OHLCV exactly."""
+    return [
+        {"datetime": ts + pd.Timedelta(seconds=0), "price": bar.open, "volume": 1},
+        {"datetime": ts + pd.Timedelta(seconds=15), "price": bar.high, "volume": 1},
+        {"datetime": ts + pd.Timedelta(seconds=30), "price": bar.low, "volume": 1},
+        {"datetime": ts + pd.Timedelta(seconds=45), "price": bar.close, "volume": int(bar.volume) - 3},
+    ]
+
+
+def loaded_handler(history: pd.DataFrame) -> DataHandler:
+    dh = DataHandler(make_config(), mode="backtest")
+    dh.historical_data["AAPL"] = dh._compute_all_indicators(history, dh._ind_state["AAPL"])
+    dh._set_last_minute("AAPL", history.index[-1].value // NS_PER_MIN)
+    return dh
+
+
+def batch_indicators(bars: pd.DataFrame) -> pd.DataFrame:
+    """compute_all over every bar, sessions split at market-tz midnight."""
+    session = bars.index.tz_localize(None).as_unit("ns").asi8 // NS_PER_DAY
+    out = compute_all(
+        *(np.ascontiguousarray(bars[c].to_numpy()) for c in ("high", "low", "close", "volume")),
+        12, 26, 14, 20, 2.0, 14, session
+    )
+    return bars.assign(**dict(zip(OUTPUT_COLUMNS, out)))
+
+
+def test_streamed_ticks_match_batch_across_midnight():
+    # History ends at 22:59; streaming runs to 00:39, past the midnight where
+    # VWAP restarts (and still inside the 78-minute retention window)
+    bars = make_bars("2025-06-02 20:00", 280)
+    history, live = bars.iloc[:180], bars.iloc[180:]
+    dh = loaded_handler(history)
+
+    for ts, bar in live.iterrows():
+        for tick in bar_ticks(ts, bar):
+            dh.update_realtime("AAPL", tick)
+    # The next minute's first tick closes the last live bar
+    dh.update_realtime("AAPL", {"datetime": live.index[-1] + pd.Timedelta(minutes=1),
+                                "price": 1.0, "volume": 1})
+
+    expected = batch_indicators(bars)
+    got = dh.historical_data["AAPL"]
+    assert got.index[-1] == live.index[-1]
+    assert got.index[0] > live.index[0]   # pruned to the live retention window
+    np.testing.assert_array_equal(
+        got.to_numpy(), expected.loc[got.index, BAR_COLUMNS].to_numpy()
+    )
+    assert dh.latest_indicators("AAPL")["vwap"] == expected["vwap"].iloc[-1]
+
+    # VWAP restarted at midnight: the new day's first bar is its own VWAP
+    midnight = pd.Timestamp("2025-06-03 00:00", tz=TZ)
+    assert got.loc[midnight, "vwap"] == got.loc[midnight, "close"]
+
+
+def test_tick_buffer_take_and_rewind():
+    buf = TickBuffer(capacity=4)
+    for price in (10.0, 11.0, 9.0):
+        buf.append(1, price, 5)
+    buf.append(2, 12.0, 7)   # grows past the initial capacity
+    buf.append(2, 13.0, 8)
+    assert len(buf) == 5
+
+    prices, volumes = buf.take(1)
+    assert prices.tolist() == [10.0, 11.0, 9.0]
+    assert volumes.tolist() == [5, 5, 5]
+    assert len(buf) == 5      # minute 2 is still pending
+    prices, volumes = buf.take(2)
+    assert prices.tolist() == [12.0, 13.0]
+    assert volumes.tolist() == [7, 8]
+    assert len(buf) == 0      # nothing pending → rewound
+    assert buf.take(2) is None
+
+
+def test_late_tick_is_dropped():
+    bars = make_bars("2025-06-02 09:30", 60)
+    dh = loaded_handler(bars)
+    n = dh.bar_count("AAPL")
+    t0 = bars.index[-1] + pd.Timedelta(minutes=1)
+
+    dh.update_realtime("AAPL", {"datetime": t0, "price": 100.0, "volume": 10})
+    dh.update_realtime("AAPL", {"datetime": t0 + pd.Timedelta(minutes=1), "price": 101.0, "volume": 10})
+    assert dh.bar_count("AAPL") == n + 1
+    # A tick for the minute just finalized arrives late: dropped, bar untouched
+    dh.update_realtime("AAPL", {"datetime": t0 + pd.Timedelta(seconds=30), "price": 500.0, "volume": 99})
+    assert dh.last_close("AAPL") == 100.0
+    assert len(dh.real_time_buffer["AAPL"]) == 1
+    assert dh.last_timestamp["AAPL"] == t0 + pd.Timedelta(minutes=1)
+
+
+def test_minute_without_ticks_is_skipped():
+    bars = make_bars("2025-06-02 09:30", 60)
+    dh = loaded_handler(bars)
+    n = dh.bar_count("AAPL")
+    t0 = bars.index[-1] + pd.Timedelta(minutes=1)
+    # Gap minute: the open minute jumps ahead, only minutes with ticks become bars
+    dh.update_realtime("AAPL", {"datetime": t0, "price": 100.0, "volume": 10})
+    dh.update_realtime("AAPL", {"datetime": t0 + pd.Timedelta(minutes=5), "price": 101.0, "volume": 10})
+    dh.update_realtime("AAPL", {"datetime": t0 + pd.Timedelta(minutes=6), "price": 102.0, "volume": 10})
+    assert dh.bar_count("AAPL") == n + 2
+    ts = dh.bar_timestamps("AAPL")[-2:]
+    assert (ts // NS_PER_MIN).tolist() == [t0.value // NS_PER_MIN, t0.value // NS_PER_MIN + 5]
+
+
+def test_tick_ring_push_pop_and_full():
+    ring = TickRing(capacity=4)
+    assert [ring.push(i, float(i), i) for i in range(5)] == [True, True, True, True, False]
+    assert ring.pop_all() == ([0, 1, 2, 3], [0.0, 1.0, 2.0, 3.0], [0, 1, 2, 3])
+    assert len(ring) == 0
+    assert ring.pop_all() == ([], [], [])
+    # Indices wrap around the fixed arrays
+    assert ring.push(9, 9.0, 9)
+    assert ring.pop_all() == ([9], [9.0], [9])
+
+
+def test_drained_producer_ticks_match_update_realtime():
+    history = make_bars("2025-06-02 09:30", 100, seed=1)
+    rng = np.random.default_rng(3)
+    t0 = history.index[-1] + pd.Timedelta(minutes=1)
+    ticks = [
+        {"datetime": t0 + pd.Timedelta(seconds=i), "price": float(100 + rng.normal()),
+         "volume": int(rng.integers(1, 10))}
+        for i in range(3000)
+    ]
+
+    direct = loaded_handler(history)
+    for tick in ticks:
+        direct.update_realtime("AAPL", tick)
+
+    queued = loaded_handler(history)
+    inbox = queued._tick_inbox["AAPL"]
+
+    def produce():
+        for tick in ticks:
+            while len(inbox) >= TickRing.CAPACITY:   # back-pressure instead of dropping
+                time.sleep(0)
+            queued.submit_tick("AAPL", tick)
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    drained = 0
+    while producer.is_alive() or len(inbox):
+        drained += queued.drain_ticks("AAPL")
+    producer.join()
+
+    assert drained == len(ticks)
+    pd.testing.assert_frame_equal(queued.historical_data["AAPL"], direct.historical_data["AAPL"])
+    assert queued.last_timestamp == direct.last_timestamp
+
+
+def test_submit_tick_drops_when_inbox_full(caplog):
+    dh = loaded_handler(make_bars("2025-06-02 09:30", 30))
+    t0 = pd.Timestamp("2025-06-02 10:00", tz=TZ)
+    for i in range(TickRing.CAPACITY + 1):
+        dh.submit_tick("AAPL", {"datetime": t0, "price": 100.0, "volume": 1})
+    assert len(dh._tick_inbox["AAPL"]) == TickRing.CAPACITY
+    assert "tick inbox full" in caplog.text
+    assert dh.drain_ticks("AAPL") == TickRing.CAPACITY
+
+
+# -----------------------------------------------------------------------------
+# Bar queries and the backtest replay cursor
+# -----------------------------------------------------------------------------
+def test_replay_cursor_limits_every_query():
+    bars = make_bars("2025-06-02 09:30", 100)
+    dh = loaded_handler(bars)
+    full = dh.historical_data["AAPL"]
+
+    dh.set_replay_end("AAPL", 40)
+    assert dh.bar_count("AAPL") == 40
+    assert dh.last_close("AAPL") == full["close"].iloc[39]
+    assert dh.last_bar_ts("AAPL") == full.index[39].value
+    view = dh.latest("AAPL", k=5)
+    assert view.ts.tolist() == full.index[35:40].as_unit("ns").asi8.tolist()
+    np.testing.assert_array_equal(view.rsi, full["rsi"].iloc[35:40])
+    np.testing.assert_array_equal(dh.latest_columns("AAPL", 3)["volume"], full["volume"].iloc[37:40])
+    pd.testing.assert_frame_equal(dh.compute_indicators("AAPL"), full.iloc[:40])
+    # Timestamps ignore the cursor (the backtest clock is built from them)
+    assert len(dh.bar_timestamps("AAPL")) == 100
+
+    dh.set_replay_end("AAPL", 0)
+    assert dh.bar_count("AAPL") == 0
+    assert np.isnan(dh.last_close("AAPL"))
+    assert dh.last_bar_ts("AAPL") is None
+    assert len(dh.latest("AAPL").ts) == 0
+
+    dh.set_replay_end("AAPL", None)
+    assert dh.bar_count("AAPL") == 100
+    assert dh.last_close("AAPL") == full["close"].iloc[-1]
+
+
+def test_compute_indicators_memo_returns_independent_copies():
+    bars = make_bars("2025-06-02 09:30", 60)
+    dh = loaded_handler(bars)
+
+    first = dh.compute_indicators("AAPL")
+    first["close"] = -1.0   # a caller scribbling on its copy
+    second = dh.compute_indicators("AAPL")
+    assert second is not first
+    pd.testing.assert_frame_equal(second, dh.historical_data["AAPL"])
+
+    # A replay step and a new bar each invalidate the memo
+    dh.set_replay_end("AAPL", 30)
+    assert len(dh.compute_indicators("AAPL")) == 30
+    dh.set_replay_end("AAPL", None)
+    assert len(dh.compute_indicators("AAPL")) == 60
+    t0 = bars.index[-1] + pd.Timedelta(minutes=1)
+    dh.update_realtime("AAPL", {"datetime": t0, "price": 100.0, "volume": 10})
+    dh.update_realtime("AAPL", {"datetime": t0 + pd.Timedelta(minutes=1), "price": 101.0, "volume": 10})
+    latest = dh.compute_indicators("AAPL")
+    assert latest.index[-1] == t0
+    assert latest["close"].iloc[-1] == 100.0
+
+
+def test_latest_rows_are_plain_float_tuples_oldest_first():
+    bars = make_bars("2025-06-02 09:30", 60)
+    dh = loaded_handler(bars)
+    full = dh.historical_data["AAPL"]
+
+    prev, cur = dh.latest_rows("AAPL", ("close", "rsi", "volume"))
+    assert cur == tuple(full[["close", "rsi", "volume"]].iloc[-1])
+    assert prev == tuple(full[["close", "rsi", "volume"]].iloc[-2])
+    assert all(type(v) is float for v in cur)
+
+    # A single column still unpacks as a one-element tuple
+    rows = dh.latest_rows("AAPL", ("close",), k=3)
+    assert rows == [(c,) for c in full["close"].iloc[-3:]]
+
+    dh.set_replay_end("AAPL", 1)
+    assert dh.latest_rows("AAPL", ("close",), k=2) == [(full["close"].iloc[0],)]
+    assert dh.latest_rows("AAPL", ("close",), k=0) == []
@@ -0,0 +1,171 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+import ta
+
+from src import indicators as ind
+from src.indicators_nb import OUTPUT_COLUMNS, IndicatorState, compute_all
+from src.signals_nb import SCORE_COLUMNS, score_matrix, score_signals
+
+EMA_S, EMA_L, RSI_N, BB_N, BB_K, ATR_N = 12, 26, 14, 20, 2.0, 14
+
+
+def make_bars(n: int = 300, seed: int = 0) -> pd.DataFrame:
+    """Random-walk 1-minute OHLCV bars."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2025-06-02 09:30", periods=n, freq="1min", tz="US/Eastern")
+    open_ = 100 + np.cumsum(rng.standard_normal(n)) * 0.5
+    close = open_ + rng.standard_normal(n) * 0.1
+    return pd.DataFrame({
+        "open": open_,
+        "high": np.maximum(open_, close) + np.abs(rng.standard_normal(n)),
+        "low": np.minimum(open_, close) - np.abs(rng.standard_normal(n)),
+        "close": close,
+        "volume": rng.integers(100, 1000, n).astype(float),
+    }, index=index)
+
+
+def reference(df: pd.DataFrame) -> dict:
+    """The `ta` indicators the kernels reproduce (VWAP is a plain cumulative ratio)."""
+    close = df["close"]
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        bb = ta.volatility.BollingerBands(close, BB_N, BB_K)
+        return {
+            "ema_short": ta.trend.EMAIndicator(close, EMA_S).ema_indicator(),
+            "ema_long": ta.trend.EMAIndicator(close, EMA_L).ema_indicator(),
+            "rsi": ta.momentum.RSIIndicator(close, RSI_N).rsi(),
+            "bb_hband": bb.bollinger_hband(),
+            "bb_lband": bb.bollinger_lband(),
+            "bb_mavg": bb.bollinger_mavg(),
+            "vwap": (close * df["volume"]).cumsum() / df["volume"].cumsum(),
+            "atr": ta.volatility.AverageTrueRange(
+                df["high"], df["low"], close, ATR_N
+            ).average_true_range(),
+        }
+
+
+def computed(df: pd.DataFrame) -> dict:
+    bb_h, bb_l, bb_m = ind.compute_bb(df, BB_N, BB_K)
+    return {
+        "ema_short": ind.compute_ema(df, EMA_S),
+        "ema_long": ind.compute_ema(df, EMA_L),
+        "rsi": ind.compute_rsi(df, RSI_N),
+        "bb_hband": bb_h,
+        "bb_lband": bb_l,
+        "bb_mavg": bb_m,
+        "vwap": ind.compute_vwap(df),
+        "atr": ind.compute_atr(df, ATR_N),
+    }
+
+
+def assert_same(got, expected, name):
+    np.testing.assert_allclose(
+        np.asarray(got, dtype=np.float64), np.asarray(expected, dtype=np.float64),
+        rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=name
+    )
+
+
+def test_indicators_match_ta():
+    df = make_bars()
+    expected = reference(df)
+    for name, series in computed(df).items():
+        assert_same(series, expected[name], name)
+
+
+def test_warmup_nans_match_ta():
+    df = make_bars()
+    got = computed(df)
+    expected = reference(df)
+    for name in ("rsi", "bb_hband", "bb_lband", "bb_mavg"):
+        assert np.array_equal(got[name].isna().to_numpy(), expected[name].isna().to_numpy()), name
+    assert got["bb_mavg"].iloc[:BB_N - 1].isna().all()
+    assert got["bb_mavg"].iloc[BB_N - 1:].notna().all()
+    assert (got["atr"].iloc[:ATR_N - 1] == 0.0).all()
+
+
+def test_nan_input_matches_ta():
+    df = make_bars(150)
+    close = df.columns.get_loc("close")
+    df.iloc[30, close] = np.nan
+    df.iloc[60:63, close] = np.nan
+    expected = reference(df)
+    got = computed(df)
+    for name in ("ema_short", "ema_long", "rsi", "bb_hband", "bb_lband", "bb_mavg"):
+        assert_same(got[name], expected[name], name)
+    # VWAP follows pandas' cumsum: NaN on the missing bars only, their
+    # volume still counted
+    pandas_vwap = (df["close"] * df["volume"]).cumsum() / df["volume"].cumsum()
+    assert_same(got["vwap"], pandas_vwap, "vwap")
+    assert got["vwap"].isna().sum() == 4
+
+
+def test_short_input_is_all_warmup():
+    df = make_bars(5)
+    got = computed(df)
+    assert got["rsi"].isna().all()
+    assert got["bb_mavg"].isna().all()
+    assert (got["atr"] == 0.0).all()
+
+
+def test_compute_all_matches_single_indicators():
+    df = make_bars()
+    out = compute_all(
+        df["high"].to_numpy(), df["low"].to_numpy(), df["close"].to_numpy(),
+        df["volume"].to_numpy(), EMA_S, EMA_L, RSI_N, BB_N, BB_K, ATR_N
+    )
+    expected = computed(df)
+    for name, values in zip(OUTPUT_COLUMNS, out):
+        assert_same(values, expected[name], name)
+
+
+@pytest.mark.parametrize("split", [1, BB_N - 1, 150])
+def test_state_seed_then_update_matches_compute_all(split):
+    df = make_bars()
+    high, low, close, volume = (
+        np.ascontiguousarray(df[c].to_numpy()) for c in ("high", "low", "close", "volume")
+    )
+    session = np.repeat(np.arange(3, dtype=np.int64), 100)
+    full = compute_all(high, low, close, volume, EMA_S, EMA_L, RSI_N, BB_N, BB_K, ATR_N, session)
+
+    state = IndicatorState(EMA_S, EMA_L, RSI_N, BB_N, BB_K, ATR_N)
+    seeded = state.seed(high[:split], low[:split], close[:split], volume[:split], session[:split])
+    for name, a, b in zip(OUTPUT_COLUMNS, seeded, full):
+        assert_same(a, b[:split], name)
+
+    for i in range(split, len(df)):
+        latest = state.update(high[i], low[i], close[i], volume[i], int(session[i]))
+        for j, name in enumerate(OUTPUT_COLUMNS):
+            assert_same(latest[name], full[j][i], f"{name}[{i}]")
+
+
+def test_state_reset_forgets_history():
+    df = make_bars(50)
+    state = IndicatorState(EMA_S, EMA_L, RSI_N, BB_N, BB_K, ATR_N)
+    state.seed(*(np.ascontiguousarray(df[c].to_numpy()) for c in ("high", "low", "close", "volume")))
+    state.reset()
+    assert state.latest == {}
+    assert not state.state.any()
+
+
+def test_score_matrix_matches_score_signals():
+    rng = np.random.default_rng(1)
+    n = 2000
+    width = len(SCORE_COLUMNS)
+    prev = rng.choice([1.0, 2.0, np.nan], (n, width))
+    cur = rng.choice([1.0, 2.0, np.nan], (n, width))
+    cur[:, SCORE_COLUMNS.index("rsi")] = rng.choice([10.0, 50.0, 90.0, np.nan], n)
+    predicted = rng.choice([0.02, -0.02, 0.0], n)
+
+    buy, sell = score_matrix(prev, cur, predicted, 30.0, 70.0)
+    assert buy.shape == sell.shape == (n,)
+    for i in range(n):
+        p, c = prev[i], cur[i]
+        expected = score_signals(
+            p[0], c[0], p[1], c[1], p[2], c[2], c[3],
+            p[4], c[4], p[5], c[5], p[6], c[6],
+            predicted[i], 30.0, 70.0
+        )
+        assert (buy[i], sell[i]) == expected, i
@@ -0,0 +1,92 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.risk_manager import RiskManager
+
+
+def make_config(**overrides):
+    values = dict(
+        initial_capital=100_000.0,
+        max_position_pct=0.1,
+        stop_loss_pct=1.0,
+        take_profit_pct=3.0,
+        daily_max_loss_pct=5.0,
+        target_daily_return_pct=2.0,
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+@pytest.fixture
+def rm():
+    return RiskManager(make_config())
+
+
+def test_percent_sizing_without_atr(rm):
+    qty, sl, tp = rm.calculate_position_size("AAPL", 100.0)
+    assert qty == 100
+    assert sl == pytest.approx(99.0)
+    assert tp == pytest.approx(103.0)
+
+
+def test_open_reserves_cash_and_close_books_pnl(rm):
+    pos = rm.open_position("AAPL", 100.0)
+    assert pos is not None and pos.quantity == 100
+    assert rm.available_cash == pytest.approx(90_000.0)
+
+    rm.close_position("AAPL", 102.0)
+    assert rm.capital == pytest.approx(100_200.0)
+    assert rm.available_cash == pytest.approx(100_200.0)
+    assert not pos.is_open
+    (trade,) = rm.trade_history
+    assert trade["symbol"] == "AAPL"
+    assert trade["pnl"] == pytest.approx(200.0)
+    assert trade["equity_after"] == pytest.approx(100_200.0)
+
+
+def test_open_fails_when_cash_is_short():
+    rm = RiskManager(make_config(max_position_pct=0.6))
+    assert rm.open_position("AAPL", 100.0) is not None
+    assert rm.open_position("MSFT", 100.0) is None
+    assert "MSFT" not in rm.positions
+
+
+def test_revert_open_refunds_without_trade(rm):
+    rm.open_position("AAPL", 100.0)
+    rm.revert_open("AAPL")
+    assert rm.available_cash == pytest.approx(100_000.0)
+    assert "AAPL" not in rm.positions
+    assert rm.trade_history == []
+    assert rm.check_exits({"AAPL": 1.0}) == []
+
+
+def test_check_exits(rm):
+    for symbol in ("AAPL", "MSFT", "NVDA"):
+        rm.open_position(symbol, 100.0)   # SL 99, TP 103
+    hits = rm.check_exits({"AAPL": 98.0, "MSFT": 100.0, "NVDA": 104.0})
+    assert sorted(hits) == [("AAPL", "SL"), ("NVDA", "TP")]
+    # Symbols without a price are skipped
+    assert rm.check_exits({"MSFT": 100.0}) == []
+
+
+def test_check_exits_after_close_keeps_slots_consistent(rm):
+    rm.open_position("AAPL", 100.0)
+    rm.open_position("MSFT", 50.0)    # SL 49.5, TP 51.5
+    rm.close_position("AAPL", 100.0)  # MSFT moves into AAPL's slot
+    assert rm.check_exits({"AAPL": 1.0, "MSFT": 49.0}) == [("MSFT", "SL")]
+    assert rm.check_exits({"MSFT": 52.0}) == [("MSFT", "TP")]
+
+
+def test_drawdown_blocks_new_positions(rm):
+    rm.open_position("AAPL", 100.0)
+    rm.close_position("AAPL", 40.0)   # -6,000 on 100,000 → 6% drawdown
+    assert rm.get_current_drawdown() == pytest.approx(0.06)
+    assert rm.can_open_position("MSFT", 10.0) is None
+
+
+def test_daily_targets(rm):
+    assert rm.check_daily_targets()
+    rm.open_position("AAPL", 100.0)
+    rm.close_position("AAPL", 130.0)  # +3%
+    assert not rm.check_daily_targets()
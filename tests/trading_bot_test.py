@@ -0,0 +1,146 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+import pytz
+
+from src.data_handler import DataHandler
+from src.risk_manager import RiskManager
+from src.signals_nb import BUY_THRESHOLD, SCORE_COLUMNS, score_matrix
+from src.trading_bot import TradingBot
+
+SYMBOLS = ("AAPL", "MSFT", "NVDA", "AMD", "TSLA")
+
+
+def make_config(**overrides):
+    values = dict(
+        mode="backtest", symbols=SYMBOLS,
+        time_zone=pytz.timezone("US/Eastern"), local_tz=pytz.timezone("Asia/Seoul"),
+        ema_short_period=12, ema_long_period=26, rsi_period=14,
+        rsi_oversold=45, rsi_overbought=55, bb_period=20, bb_std_dev=2.0, atr_period=14,
+        ema_alpha_short=None, ema_alpha_long=None, rsi_alpha=None,
+        historical_lookback_days=36500,
+        initial_capital=1_000_000.0, max_position_pct=0.001,
+        stop_loss_pct=0.5, take_profit_pct=1.0,
+        daily_max_loss_pct=50.0, target_daily_return_pct=50.0,
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def make_bars(n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2025-06-02 09:30", periods=n, freq="1min", tz="US/Eastern")
+    open_ = 100 + np.cumsum(rng.standard_normal(n)) * 0.3
+    close = open_ + rng.standard_normal(n) * 0.2
+    return pd.DataFrame({
+        "open": open_,
+        "high": np.maximum(open_, close) + np.abs(rng.standard_normal(n)) * 0.2,
+        "low": np.minimum(open_, close) - np.abs(rng.standard_normal(n)) * 0.2,
+        "close": close,
+        "volume": rng.integers(100, 1000, n).astype(float),
+    }, index=index)
+
+
+class MomentumAI:
+    """Deterministic AIClient stand-in: sign of the last close-to-close move."""
+
+    def predict(self, symbol, features):
+        close = features["close"]
+        return 0.01 if close[-1] > close[-2] else -0.01
+
+    def predict_many(self, items):
+        return {symbol: self.predict(symbol, features) for symbol, features in items}
+
+
+def make_bot(config, n_bars=200) -> TradingBot:
+    dh = DataHandler(config, mode="backtest")
+    for j, symbol in enumerate(config.symbols):
+        dh.historical_data[symbol] = dh._compute_all_indicators(
+            make_bars(n_bars + 5 * j, seed=j), dh._ind_state[symbol]
+        )
+    return TradingBot(config, dh, RiskManager(config), ai_client=MomentumAI())
+
+
+def record_orders(bot: TradingBot) -> list:
+    """Log every non-HOLD signal execute_order() receives, then execute it."""
+    orders = []
+    execute = bot.execute_order
+
+    def _record(signal, symbol):
+        orders.append((symbol, signal["signal"], signal.get("price"), signal.get("quantity")))
+        execute(signal, symbol)
+
+    bot.execute_order = _record
+    return orders
+
+
+def test_evaluate_matches_per_symbol_generate_signals():
+    config = make_config()
+    batch, single = make_bot(config), make_bot(config)
+    batch_orders, single_orders = record_orders(batch), record_orders(single)
+
+    for n in range(20, 200):
+        step = len(batch_orders), len(single_orders)
+        for bot in (batch, single):
+            for symbol in SYMBOLS:
+                bot.data_handler.set_replay_end(symbol, n)
+
+        batch._evaluate(list(SYMBOLS))
+
+        predictions = single._predict_all(list(SYMBOLS))
+        for symbol in SYMBOLS:
+            sig = single.generate_signals(symbol, predictions.get(symbol))
+            if sig["signal"] != "HOLD":
+                single.execute_order(sig, symbol)
+
+        # Same orders per bar; _evaluate only reorders them (strongest first)
+        assert sorted(batch_orders[step[0]:]) == sorted(single_orders[step[1]:]), n
+
+    assert len(batch_orders) > 10
+    assert {o[1] for o in batch_orders} >= {"BUY", "SELL"}
+    assert batch.risk_manager.capital == pytest.approx(single.risk_manager.capital)
+
+
+def test_evaluate_claims_cash_strongest_first():
+    # Room for one position only: it must go to the strongest BUY score
+    config = make_config(initial_capital=10_000.0, max_position_pct=0.6)
+    bot = make_bot(config)
+    symbols = list(SYMBOLS)
+
+    for n in range(20, 200):
+        for symbol in SYMBOLS:
+            bot.data_handler.set_replay_end(symbol, n)
+        predictions = bot._predict_all(symbols)
+        predicted = np.array([predictions.get(s, 0.0) for s in symbols])
+        prev, cur = bot.data_handler.latest_matrix(symbols, SCORE_COLUMNS)
+        buy, sell = score_matrix(prev, cur, predicted, config.rsi_oversold, config.rsi_overbought)
+        # Candidates are ranked on max(buy, sell); ties keep 'symbols' order
+        urgency = np.where(buy >= BUY_THRESHOLD, np.maximum(buy, sell), -np.inf)
+        ranked = np.sort(urgency)[::-1]
+        if np.isfinite(ranked[1]) and ranked[0] > ranked[1] and np.argmax(urgency) > 0:
+            break
+    else:
+        pytest.fail("no bar where a later symbol outranks the others")
+
+    bot._evaluate(symbols)
+    opened = [s for s, p in bot.risk_manager.positions.items() if p.is_open]
+    assert opened == [symbols[int(np.argmax(urgency))]]
+    assert bot.risk_manager.available_cash >= 0.0
+
+
+def test_latest_matrix_matches_latest_rows_and_pads():
+    config = make_config()
+    bot = make_bot(config)
+    dh = bot.data_handler
+    dh.set_replay_end("AAPL", 1)   # only one bar: the previous row is NaN-padded
+    prev, cur = dh.latest_matrix(list(SYMBOLS), SCORE_COLUMNS, k=2)
+    assert prev.shape == cur.shape == (len(SYMBOLS), len(SCORE_COLUMNS))
+
+    assert np.isnan(prev[0]).all()
+    np.testing.assert_array_equal(cur[0], dh.latest_rows("AAPL", SCORE_COLUMNS, k=2)[0])
+    for i, symbol in enumerate(SYMBOLS[1:], start=1):
+        rows = dh.latest_rows(symbol, SCORE_COLUMNS, k=2)
+        np.testing.assert_array_equal(prev[i], rows[0])
+        np.testing.assert_array_equal(cur[i], rows[1])